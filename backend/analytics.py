@@ -0,0 +1,215 @@
+from __future__ import annotations
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # analytics is optional; the rest of the backend runs without it
+    np = None
+
+from archive import BookingArchive
+from models import Hotel
+
+if np is not None:
+    # archive.STAY_ROW as a record type
+    STAY_DTYPE = np.dtype([
+        ("end", "<i8"), ("check_in", "<i4"), ("check_out", "<i4"),
+        ("price", "<f8"), ("room_type", "S16"),
+    ])
+
+GROUPINGS = ("type", "all")
+# longest range one report may cover
+MAX_DAYS = 3660
+
+
+def analytics_available() -> bool:
+    return np is not None
+
+
+class Analytics:
+    """Daily occupancy, ADR and RevPAR over a date range.
+
+    Every booking, current or archived (read from the archive's stay
+    rows), becomes one row of parallel NumPy columns (group code, nightly
+    price, first night, checkout day as ordinals). A report clips the stays to the range and turns them into
+    per-day counts with two ``bincount`` calls over a difference array
+    and a cumulative sum, so its cost does not grow with a Python loop
+    per booking.
+
+    Occupancy is measured against the current room inventory; archived
+    stays are priced at the room price recorded at checkout.
+    """
+
+    def __init__(self, hotel: Hotel, archive: BookingArchive) -> None:
+        if np is None:
+            raise RuntimeError("analytics needs numpy (pip install numpy)")
+        self.hotel = hotel
+        self.archive = archive
+        self._lock = threading.Lock()
+        # room type -> group code; codes are never reassigned
+        self._type_codes: Dict[str, int] = {}
+        # room number -> (room version, type code, price, starts, ends)
+        self._rooms: Dict[str, Tuple[int, int, float, Any, Any]] = {}
+        # archive month -> (stays size, {"group", "price", "start", "end"})
+        self._months: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        # ((hotel version, first archive month), columns) of the last report
+        self._last: Optional[Tuple[Tuple[int, str], Dict[str, Any]]] = None
+
+    # -------- columns --------
+    def _code(self, room_type: str) -> int:
+        return self._type_codes.setdefault(room_type, len(self._type_codes))
+
+    def _room_rows(self, room: Any, version: int) -> Tuple[int, int, float, Any, Any]:
+        stays = [
+            (b.check_in_date.toordinal(), b.check_out_date.toordinal())
+            for b in self.hotel.get_bookings(room.number)
+            if b.check_in_date is not None and b.check_out_date is not None
+        ]
+        spans = np.array(stays, dtype=np.int64).reshape(-1, 2)
+        return version, self._code(room.type), room.price, spans[:, 0], spans[:, 1]
+
+    def _month_rows(self, month: str) -> Dict[str, Any]:
+        size = self.archive.stays_size(month)
+        cached = self._months.get(month)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+        stays = np.frombuffer(self.archive.stay_rows(month), dtype=STAY_DTYPE)
+        stays = stays[(stays["check_in"] > 0) & (stays["check_out"] > 0)]
+        names, inverse = np.unique(stays["room_type"], return_inverse=True)
+        codes = np.array([self._code(n.decode("utf-8")) for n in names], dtype=np.int64)
+        rows = {
+            "group": codes[inverse].reshape(-1),
+            "price": stays["price"].astype(np.float64),
+            "start": stays["check_in"].astype(np.int64),
+            "end": stays["check_out"].astype(np.int64),
+        }
+        self._months[month] = (size, rows)
+        return rows
+
+    def _columns(self, first_month: str) -> Dict[str, Any]:
+        """Columns of every stay that can reach ``first_month`` or later.
+
+        Rooms are re-read only when their version moved and archive months
+        only when they grew, so after one booking change the
+        rebuild costs one room plus the concatenation.
+        """
+        key = (self.hotel.version, first_month)
+        with self._lock:
+            if self._last is not None and self._last[0] == key:
+                return self._last[1]
+
+            rooms = list(self.hotel.rooms)
+            entries = []
+            for room in rooms:
+                version = self.hotel.room_version(room.number)
+                entry = self._rooms.get(room.number)
+                if entry is None or entry[0] != version:
+                    entry = self._rooms[room.number] = self._room_rows(room, version)
+                entries.append(entry)
+            if len(self._rooms) > len(rooms):
+                numbers = {room.number for room in rooms}
+                self._rooms = {n: e for n, e in self._rooms.items() if n in numbers}
+
+            counts = np.fromiter((len(e[3]) for e in entries), dtype=np.int64, count=len(entries))
+            room_codes = np.fromiter((e[1] for e in entries), dtype=np.int64, count=len(entries))
+            # stays checked out before the first month can't reach into it
+            months = [self._month_rows(m) for m in self.archive.months() if m >= first_month]
+
+            def joined(current: List[Any], name: str, dtype: Any) -> Any:
+                return np.concatenate(
+                    [np.zeros(0, dtype=dtype)] + current + [m[name] for m in months]
+                ).astype(dtype, copy=False)
+
+            columns = {
+                "types": sorted(self._type_codes, key=self._type_codes.get),
+                "room_codes": room_codes,
+                "group": joined([np.repeat(room_codes, counts)], "group", np.int64),
+                "price": joined(
+                    [np.repeat(np.array([e[2] for e in entries], dtype=np.float64), counts)],
+                    "price", np.float64,
+                ),
+                "start": joined([e[3] for e in entries], "start", np.int64),
+                "end": joined([e[4] for e in entries], "end", np.int64),
+            }
+            self._last = (key, columns)
+            return columns
+
+    # -------- reports --------
+    def report(self, first: date, last: date, group_by: str = "type") -> Dict[str, Any]:
+        """Per-day series for the nights ``first``..``last`` (both inclusive)."""
+        if group_by not in GROUPINGS:
+            raise ValueError(f"groupBy must be one of {', '.join(GROUPINGS)}")
+        days = (last - first).days + 1
+        if days < 1:
+            raise ValueError("to must not be before from")
+        if days > MAX_DAYS:
+            raise ValueError(f"range is limited to {MAX_DAYS} days")
+
+        columns = self._columns(first.isoformat()[:7])
+        if group_by == "type":
+            names = columns["types"]
+            group = columns["group"]
+            room_codes = columns["room_codes"]
+        else:
+            names = ["all"]
+            group = np.zeros(len(columns["group"]), dtype=np.int64)
+            room_codes = np.zeros(len(columns["room_codes"]), dtype=np.int64)
+        groups = len(names)
+
+        # nights as day offsets into the range; each stay covers [start, end)
+        width = days + 1
+        start = np.clip(columns["start"] - first.toordinal(), 0, days)
+        end = np.clip(columns["end"] - first.toordinal(), 0, days)
+        keep = end > start
+        opens = group[keep] * width + start[keep]
+        closes = group[keep] * width + end[keep]
+        price = columns["price"][keep]
+
+        size = groups * width
+        sold = (
+            np.bincount(opens, minlength=size) - np.bincount(closes, minlength=size)
+        ).reshape(groups, width).cumsum(axis=1)[:, :days]
+        revenue = (
+            np.bincount(opens, weights=price, minlength=size)
+            - np.bincount(closes, weights=price, minlength=size)
+        ).reshape(groups, width).cumsum(axis=1)[:, :days]
+        rooms = np.bincount(room_codes, minlength=groups)[:, None]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            occupancy = np.where(rooms > 0, sold / rooms * 100, 0.0)
+            adr = np.where(sold > 0, revenue / np.maximum(sold, 1), np.nan)
+            revpar = np.where(rooms > 0, revenue / np.maximum(rooms, 1), 0.0)
+
+        series = {}
+        for i, name in enumerate(names):
+            total_sold = int(sold[i].sum())
+            total_revenue = float(revenue[i].sum())
+            supply = int(rooms[i, 0]) * days
+            series[name] = {
+                "rooms": int(rooms[i, 0]),
+                "roomNights": sold[i].tolist(),
+                "revenue": _rounded(revenue[i]),
+                "occupancy": _rounded(occupancy[i]),
+                "adr": _rounded(adr[i]),
+                "revpar": _rounded(revpar[i]),
+                "summary": {
+                    "roomNights": total_sold,
+                    "revenue": round(total_revenue, 2),
+                    "occupancy": round(total_sold / supply * 100, 2) if supply else 0,
+                    "adr": round(total_revenue / total_sold, 2) if total_sold else None,
+                    "revpar": round(total_revenue / supply, 2) if supply else 0,
+                },
+            }
+        return {
+            "from": first.isoformat(),
+            "to": last.isoformat(),
+            "groupBy": group_by,
+            "days": [(first + timedelta(days=i)).isoformat() for i in range(days)],
+            "series": series,
+        }
+
+
+def _rounded(values: Any) -> List[Optional[float]]:
+    """2-decimal floats for JSON, with NaN (no sales) as null."""
+    return [None if v != v else v for v in np.round(values, 2).tolist()]
@@ -1,51 +1,342 @@
 from __future__ import annotations
-from datetime import datetime
+import atexit
+import functools
+import json
+import os
+import random
+import string
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 
-from models import SingleRoom, DoubleRoom, SuiteRoom, Booking
-from storage import JsonHotelRepository
+from models import (
+    ROOM_STATUSES, Hotel, SingleRoom, DoubleRoom, SuiteRoom, Booking, parse_stay, _parse_iso,
+)
+from events import EventBus
+from frontend import DIST, FrontendBundle
+from archive import BookingArchive
+from analytics import Analytics, analytics_available
+from metrics import COUNT_BUCKETS, Registry, RouteProfiler
+from serialize import RoomSerializer
+from storage import PersistenceScheduler, open_repository
 
 
-def create_app(data_path: Path | None = None) -> Flask:
+def create_app(data_path: Path | None = None, storage: str | None = None) -> Flask:
     app = Flask(__name__)
-    CORS(app)
+    CORS(app, expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"])
 
-    repo = JsonHotelRepository(
-        (data_path or Path(__file__).parent / "data.json").resolve()
+    # "json" rewrites data.json on every change; "journal" appends to data.journal
+    app.config["STORAGE"] = storage or os.environ.get("HOTEL_STORAGE", "json")
+    # recompute /stats from scratch on every call and fail loudly on drift
+    app.config["CHECK_STATS"] = os.environ.get("HOTEL_CHECK_STATS") == "1"
+    # load rooms on first access instead of at startup (sqlite only)
+    app.config["LAZY"] = os.environ.get("HOTEL_LAZY") == "1"
+    # when saves hit the disk: "sync" per request, "group" per batching
+    # window, "async" in the background within HOTEL_MAX_LAG_MS
+    app.config["PERSIST_MODE"] = os.environ.get("HOTEL_PERSIST", "sync")
+    app.config["FLUSH_WINDOW_MS"] = float(os.environ.get("HOTEL_FLUSH_WINDOW_MS", "5"))
+    app.config["MAX_LAG_MS"] = float(os.environ.get("HOTEL_MAX_LAG_MS", "1000"))
+    # request latency and hot-path counters at /metrics
+    app.config["METRICS"] = os.environ.get("HOTEL_METRICS", "1") == "1"
+    # profile one request in N under cProfile (0 = off); see /metrics/profile
+    app.config["PROFILE_EVERY"] = int(os.environ.get("HOTEL_PROFILE_EVERY", "0"))
+    # built frontend (python backend/frontend.py), served at / when present
+    app.config["FRONTEND_DIR"] = Path(os.environ.get("HOTEL_FRONTEND_DIR", DIST))
+    data_path = (data_path or Path(__file__).parent / "data.json").resolve()
+
+    registry = Registry()
+    request_seconds = registry.histogram(
+        "hotel_request_duration_seconds", "Time to produce a response, by route.",
+        ("method", "route", "status"),
+    )
+    repo_seconds = registry.histogram(
+        "hotel_repository_duration_seconds", "Repository load and save (flush) time.", ("operation",)
+    )
+    rooms_serialized = registry.counter(
+        "hotel_rooms_serialized_total",
+        "Rooms written into responses; cache=miss were encoded afresh.",
+        ("method", "route", "cache"),
+    )
+    rooms_per_request = registry.histogram(
+        "hotel_rooms_serialized_per_request", "Rooms written into responses that include rooms.",
+        ("method", "route"), buckets=COUNT_BUCKETS,
     )
+
+    repo = open_repository(app.config["STORAGE"], data_path, lazy=app.config["LAZY"], fsync=True)
+    start = time.perf_counter()
     hotel = repo.load()
+    repo_seconds.observe(time.perf_counter() - start, "load")
+    scheduler = PersistenceScheduler(
+        repo,
+        hotel,
+        app.config["PERSIST_MODE"],
+        window=app.config["FLUSH_WINDOW_MS"] / 1e3,
+        max_lag=app.config["MAX_LAG_MS"] / 1e3,
+        on_flush=lambda seconds: repo_seconds.observe(seconds, "save"),
+    )
+    # async mode may hold unflushed changes at exit
+    atexit.register(scheduler.close)
+    # completed stays, moved out of the hotel at checkout
+    archive = BookingArchive(data_path.with_suffix(".archive"))
+    # guest history is the stays on the books plus those archived
+    hotel.add_guest_history(archive.scan())
+    # occupancy / ADR / RevPAR series; None when numpy is not installed
+    analytics = Analytics(hotel, archive) if analytics_available() else None
+    events = EventBus()
+
+    # per-room encoded JSON, re-encoded only when that room changes
+    serializer = RoomSerializer(hotel)
+
+    registry.gauge("hotel_version", "Changes applied since startup.", lambda: hotel.version)
+    registry.gauge("hotel_rooms", "Rooms loaded in memory.", lambda: len(hotel._rooms_by_number))
+    registry.gauge(
+        "hotel_persistence_pending", "Saves requested but not flushed yet.",
+        lambda: scheduler.stats()["pending"],
+    )
+    registry.gauge(
+        "hotel_date_parse_cache_hits", "Date strings parsed from cache.",
+        lambda: _parse_iso.cache_info().hits,
+    )
+    registry.gauge(
+        "hotel_date_parse_cache_misses", "Date strings parsed afresh.",
+        lambda: _parse_iso.cache_info().misses,
+    )
+    profiler = RouteProfiler(app.config["PROFILE_EVERY"]) if app.config["PROFILE_EVERY"] > 0 else None
+
+    # ---------- Instrumentation ----------
+    # Hooks are only installed when enabled, so a disabled feature costs nothing.
+    def route_label() -> str:
+        return request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+
+    if app.config["METRICS"]:
+        @app.before_request
+        def start_timer():
+            g.started = time.perf_counter()
+            serializer.take_counts()
+
+        @app.after_request
+        def record_request(response):
+            route = route_label()
+            request_seconds.observe(
+                time.perf_counter() - g.started, request.method, route, str(response.status_code)
+            )
+            served, encoded = serializer.take_counts()
+            if served:
+                if served > encoded:
+                    rooms_serialized.inc(request.method, route, "hit", amount=served - encoded)
+                if encoded:
+                    rooms_serialized.inc(request.method, route, "miss", amount=encoded)
+                rooms_per_request.observe(served, request.method, route)
+            return response
+
+    if profiler is not None:
+        @app.before_request
+        def start_profile():
+            g.profile = profiler.start()
+
+        @app.teardown_request
+        def stop_profile(exc):
+            running = g.pop("profile", None)
+            if running is not None:
+                profiler.stop(running, f"{request.method} {route_label()}")
 
     # ---------- Helpers ----------
-    def room_to_public(room) -> Dict[str, Any]:
-        result = {
-            **room.to_dict(),
-            "description": room.get_description(),
-        }
-        # Include all booking details if room is booked
-        if room.is_booked and room.number in hotel._bookings:
-            booking = hotel._bookings[room.number]
-            result.update(booking.to_dict())
-        return result
+    def json_response(body: bytes, status: int = 200) -> Response:
+        return app.response_class(body, status=status, mimetype="application/json")
+
+    def check_not_past(check_out: Any) -> None:
+        """New and moved stays may not have ended already."""
+        end = _parse_iso(check_out) if isinstance(check_out, str) else None
+        if end is not None and end < date.today():
+            raise ValueError("checkOut is in the past")
+
+    # request path+query -> (etag, body, headers) for the polled read routes
+    read_cache: Dict[str, Tuple[str, bytes, Dict[str, str]]] = {}
+    READ_CACHE_SIZE = 512
+    # tells this process's ETags from those of an earlier one
+    epoch = os.urandom(4).hex()
+    CACHED_HEADERS = ("Content-Type", "X-Total-Count", "X-Next-Cursor")
+
+    def cached_read(view):
+        """Serve a GET route from a cache validated by ``hotel.version``.
+
+        The ETag is this process's epoch, the hotel version and today's
+        date (notifications are relative to today). The version restarts
+        with the process, so the epoch keeps an ETag from before a restart
+        from matching. A matching If-None-Match gets a bodiless 304;
+        otherwise the body serialized for the current version is reused.
+        """
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = f"{epoch}.{hotel.version}.{date.today().toordinal()}"
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+
+            key = request.full_path
+            cached = read_cache.get(key)
+            if cached is None or cached[0] != etag:
+                response = app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+                cached = (etag, response.get_data(), headers)
+                if len(read_cache) >= READ_CACHE_SIZE:
+                    read_cache.clear()
+                read_cache[key] = cached
+
+            response = app.response_class(cached[1], headers=cached[2])
+            response.set_etag(etag, weak=True)
+            # let browsers keep the body but revalidate it on every poll
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
 
     def persist():
-        repo.save(hotel)
+        # Call after releasing any room lock: repo.save takes room locks
+        # itself while it reads the changed rooms.
+        scheduler.save()
+
+    def new_confirmation() -> str:
+        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+
+    def read_json_lines():
+        """Yield (line_no, raw line) from a JSON Lines request body as it streams in."""
+        for line_no, raw in enumerate(request.stream, start=1):
+            if raw.strip():
+                yield line_no, raw
+
+    # room types the API accepts, by name
+    ROOM_CLASSES = {"SingleRoom": SingleRoom, "DoubleRoom": DoubleRoom, "SuiteRoom": SuiteRoom}
+    # editable booking fields: request key -> Booking attribute
+    BOOKING_FIELDS = {
+        "checkIn": "check_in",
+        "checkOut": "check_out",
+        "guestCount": "guest_count",
+        "notes": "notes",
+        "guestEmail": "guest_email",
+        "guestPhone": "guest_phone",
+    }
+
+    def room_class(name: Any) -> type:
+        cls = ROOM_CLASSES.get(name)
+        if cls is None:
+            raise ValueError("Invalid room type")
+        return cls
+
+    def room_status(value: Any) -> str | None:
+        """``value`` if it is a known status, else None (the room's default)."""
+        return value if value in ROOM_STATUSES else None
+
+    def new_booking(data: Dict[str, Any]) -> Booking:
+        """A Booking with a fresh confirmation number from a booking request."""
+        guest = (data.get("guestName") or "").strip()
+        if not guest or not data.get("checkIn") or not data.get("checkOut"):
+            raise ValueError("guestName, checkIn, checkOut required")
+        booking = Booking(
+            guest_name=guest,
+            check_in=data["checkIn"],
+            check_out=data["checkOut"],
+            guest_email=data.get("guestEmail"),
+            guest_phone=data.get("guestPhone"),
+            guest_count=data.get("guestCount", 1),
+            confirmation_number=new_confirmation(),
+            notes=data.get("notes"),
+        )
+        check_not_past(booking.check_out)
+        return booking
+
+    def booking_changes(data: Dict[str, Any]) -> Dict[str, Any]:
+        """The ``BOOKING_FIELDS`` in a request, as ``update_booking`` keywords."""
+        if "checkOut" in data:
+            check_not_past(data["checkOut"])
+        return {attr: data[key] for key, attr in BOOKING_FIELDS.items() if key in data}
+
+    def check_in(room_no: str) -> Booking:
+        """Check in the room's current booking; call under the room lock."""
+        room = hotel.get_room(room_no)
+        if room is None:
+            raise LookupError("Room not found")
+        if not room.is_booked:
+            raise ValueError("Room is not booked")
+        booking = hotel._bookings.get(room_no)
+        if booking is None:
+            raise LookupError("Booking not found")
+        if booking.checked_in:
+            raise ValueError("Guest already checked in")
+        hotel.update_booking(room_no, checked_in=True, check_in_time=datetime.now().isoformat())
+        return booking
+
+    def amenity_list(value: Any) -> List[str]:
+        if not isinstance(value, list) or not all(isinstance(a, str) for a in value):
+            raise ValueError("amenities must be a list of strings")
+        return value
+
+    def json_object(raw: bytes) -> Dict[str, Any]:
+        data = json.loads(raw)
+        if not isinstance(data, dict):
+            raise ValueError("each line must be a JSON object")
+        return data
+
+    def page_args(default_limit: int | None = None) -> Tuple[int, int | None]:
+        """``offset`` and ``limit`` query params, validated."""
+        try:
+            offset = int(request.args.get("offset", 0))
+            limit = int(request.args["limit"]) if "limit" in request.args else default_limit
+        except ValueError:
+            raise ValueError("offset and limit must be integers") from None
+        if offset < 0 or (limit is not None and limit < 1):
+            raise ValueError("offset must be >= 0 and limit positive")
+        return offset, limit
+
+    def notify(event_type: str, room_no: str, **data: Any) -> None:
+        # compact delta for /events subscribers; call after persist()
+        events.publish(event_type, {"roomNo": room_no, "version": hotel.version, **data})
 
     # ---------- Routes ----------
     @app.get("/rooms")
+    @cached_read
     def list_rooms():
-        status = request.args.get("status")
-        rooms = (
-            hotel.get_available_rooms()
-            if status == "available"
-            else hotel.get_booked_rooms()
-            if status == "booked"
-            else hotel.rooms
+        """List rooms, optionally filtered, paged and projected.
+
+        Query params: status, type, amenity (repeatable, all required),
+        minPrice, maxPrice, limit, cursor, fields (comma-separated keys).
+        The next page's cursor is returned in the X-Next-Cursor header.
+        """
+        args = request.args
+        try:
+            # not args.get(type=float): that turns a bad value into None
+            min_price = float(args["minPrice"]) if "minPrice" in args else None
+            max_price = float(args["maxPrice"]) if "maxPrice" in args else None
+            limit = int(args["limit"]) if "limit" in args else None
+            cursor = int(args["cursor"]) if "cursor" in args else None
+            if min_price != min_price or max_price != max_price:  # NaN
+                raise ValueError
+        except ValueError:
+            return jsonify({"error": "limit, cursor, minPrice and maxPrice must be numbers"}), 400
+        if limit is not None and limit < 1:
+            return jsonify({"error": "limit must be positive"}), 400
+
+        rooms, total, next_cursor = hotel.query_rooms(
+            room_type=args.get("type"),
+            status=args.get("status"),
+            amenities=args.getlist("amenity"),
+            min_price=min_price,
+            max_price=max_price,
+            cursor=cursor,
+            limit=limit,
         )
-        return jsonify([room_to_public(r) for r in rooms])
+        fields = [f for f in args.get("fields", "").split(",") if f]
+        response = json_response(serializer.encode_list(rooms, fields))
+        response.headers["X-Total-Count"] = str(total)
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        return response
 
     @app.post("/rooms")
     def add_room():
@@ -56,51 +347,241 @@ def create_app(data_path: Path | None = None) -> Flask:
         if not number or price is None or not rtype:
             return jsonify({"error": "number, type and price are required"}), 400
 
-        cls_map = {
-            "SingleRoom": SingleRoom,
-            "DoubleRoom": DoubleRoom,
-            "SuiteRoom": SuiteRoom,
-        }
-        cls = cls_map.get(rtype)
-        if cls is None:
-            return jsonify({"error": "Invalid room type"}), 400
+        try:
+            cls = room_class(rtype)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         try:
             room = cls(number, float(price))
             hotel.add_room(room)
             persist()
-            return jsonify(room_to_public(room)), 201
+            notify("room_added", room.number, room=room.to_dict())
+            return json_response(serializer.encode(room), 201)
         except ValueError as e:
             return jsonify({"error": str(e)}), 409
 
+    @app.post("/rooms/bulk")
+    def bulk_add_rooms():
+        """Add rooms from a JSON Lines body, all or nothing, with one persist.
+
+        Each line is a room object as returned by GET /rooms or /export.
+        Every line is checked first; the rooms are then added under their
+        locks, so nothing can book one of them before a rollback.
+        """
+        rooms = []
+        line_no = 0
+        try:
+            for line_no, raw in read_json_lines():
+                data = json_object(raw)
+                room_class(data.get("type"))
+                if data.get("status", "available") not in ROOM_STATUSES:
+                    raise ValueError("Invalid status")
+                amenity_list(data.get("amenities", []))
+                room = Hotel.room_from_dict(data)
+                if not room.number.strip():
+                    raise ValueError("number is required")
+                rooms.append((line_no, room))
+            with hotel.transaction(room.number for _, room in rooms):
+                for line_no, room in rooms:
+                    hotel.add_room(room)
+        except (KeyError, TypeError, ValueError) as e:
+            message = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+            return jsonify({"error": message, "line": line_no}), 400
+        if rooms:
+            persist()
+            events.publish("bulk_imported", {"rooms": len(rooms), "version": hotel.version})
+        return jsonify({"ok": True, "added": len(rooms)}), 201
+
+    @app.post("/bookings/bulk")
+    def bulk_add_bookings():
+        """Book stays from a JSON Lines body, all or nothing, with one persist.
+
+        Each line is a booking object plus ``roomNo``. Lines with a
+        confirmationNumber (as /export writes them) restore that booking
+        as it was, whatever the room's status or the dates, provided the
+        number is not on the books or in the archive already; lines without
+        one are new bookings, checked like POST /rooms/<no>/book, and get
+        a confirmation number generated.
+        """
+        booked = []
+        line_no = 0
+        try:
+            for line_no, raw in read_json_lines():
+                data = json_object(raw)
+                room_no = str(data["roomNo"])
+                booking = Hotel.booking_from_dict(data)
+                restore = bool(booking.confirmation_number)
+                if restore:
+                    number = booking.confirmation_number
+                    if hotel.find_confirmation(number) is not None or archive.get(number) is not None:
+                        raise ValueError(f"Confirmation number {number} is already in use")
+                else:
+                    booking.confirmation_number = new_confirmation()
+                    check_not_past(booking.check_out)
+                hotel.book_room(room_no, booking, restore=restore)
+                booked.append((room_no, booking))
+        except (KeyError, TypeError, LookupError, ValueError) as e:
+            # remove exactly the bookings made here, never one already on the books
+            for room_no, booking in reversed(booked):
+                try:
+                    hotel.remove_booking(room_no, booking)
+                except LookupError:
+                    pass  # cancelled meanwhile
+            message = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+            return jsonify({"error": message, "line": line_no}), 400
+        if booked:
+            persist()
+            events.publish("bulk_imported", {"bookings": len(booked), "version": hotel.version})
+        return jsonify({
+            "ok": True,
+            "added": len(booked),
+            "confirmationNumbers": [b.confirmation_number for _, b in booked],
+        }), 201
+
+    # ---------- Batch operations ----------
+    MAX_BATCH = 1000
+
+    def op_room(op: Dict[str, Any], unbooked: bool = False):
+        room = hotel._require_room(str(op["roomNo"]))
+        if unbooked and room.is_booked:
+            raise ValueError("Room is booked")
+        return room
+
+    def batch_add_room(op):
+        room = room_class(op.get("type"))(str(op["roomNo"]), float(op["price"]))
+        if "amenities" in op:
+            room.amenities = amenity_list(op["amenities"])
+        hotel.add_room(room)
+        return {}
+
+    def batch_update_room(op):
+        room = op_room(op, unbooked=True)
+        cls = room_class(op["type"]) if op.get("type") else None
+        if op.get("price") is not None:
+            hotel.set_room_price(room.number, float(op["price"]))
+        if cls is not None:
+            hotel.replace_room(room, cls(room.number, hotel.get_room(room.number).price))
+        return {}
+
+    def batch_delete_room(op):
+        hotel.remove_room(op_room(op, unbooked=True))
+        return {}
+
+    def batch_set_status(op):
+        hotel.set_room_status(op_room(op).number, room_status(op.get("status")), op.get("notes"))
+        return {}
+
+    def batch_set_amenities(op):
+        hotel.set_room_amenities(op_room(op).number, amenity_list(op.get("amenities", [])))
+        return {}
+
+    def batch_book(op):
+        booking = new_booking(op)
+        hotel.book_room(str(op["roomNo"]), booking)
+        return {"confirmationNumber": booking.confirmation_number}
+
+    def batch_unbook(op):
+        hotel.unbook_room(str(op["roomNo"]))
+        return {}
+
+    def batch_cancel_booking(op):
+        hotel.cancel_booking(str(op["roomNo"]), op["confirmationNumber"])
+        return {}
+
+    def batch_update_booking(op):
+        hotel.update_booking(str(op["roomNo"]), op.get("confirmationNumber"), **booking_changes(op))
+        return {}
+
+    def batch_checkin(op):
+        return {"checkInTime": check_in(str(op["roomNo"])).check_in_time}
+
+    BATCH_OPS = {
+        "addRoom": batch_add_room,
+        "updateRoom": batch_update_room,
+        "deleteRoom": batch_delete_room,
+        "setStatus": batch_set_status,
+        "setAmenities": batch_set_amenities,
+        "book": batch_book,
+        "unbook": batch_unbook,
+        "cancelBooking": batch_cancel_booking,
+        "updateBooking": batch_update_booking,
+        "checkIn": batch_checkin,
+    }
+
+    @app.post("/batch")
+    def apply_batch():
+        """Apply a list of operations all or nothing, with one persist.
+
+        Body: ``{"operations": [{"op": "book", "roomNo": "101", ...}, ...]}``.
+        Each operation takes the fields of the matching single-room route;
+        ``op`` is one of the ``BATCH_OPS`` names. If any operation fails,
+        every room the batch names is restored and the error is returned
+        with the failing operation's ``index``. Checkout is not offered:
+        the archive it writes cannot be rolled back.
+        """
+        data = request.get_json(force=True)
+        operations = data.get("operations") if isinstance(data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            return jsonify({"error": "operations must be a non-empty list"}), 400
+        if len(operations) > MAX_BATCH:
+            return jsonify({"error": f"at most {MAX_BATCH} operations per batch"}), 400
+        for index, op in enumerate(operations):
+            if not isinstance(op, dict) or op.get("op") not in BATCH_OPS or "roomNo" not in op:
+                return jsonify({"error": "each operation needs a known op and a roomNo", "index": index}), 400
+
+        room_numbers = [str(op["roomNo"]) for op in operations]
+        results = []
+        index = 0
+        try:
+            with hotel.transaction(room_numbers):
+                for index, op in enumerate(operations):
+                    result = BATCH_OPS[op["op"]](op)
+                    results.append({"op": op["op"], "roomNo": str(op["roomNo"]), **result})
+        except (KeyError, TypeError, LookupError, ValueError) as e:
+            message = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+            return jsonify({"error": message, "index": index}), 400
+        persist()
+        events.publish("batch_applied", {
+            "roomNos": list(dict.fromkeys(room_numbers)),
+            "version": hotel.version,
+        })
+        return jsonify({"ok": True, "results": results}), 200
+
+    @app.get("/export")
+    def export_all():
+        """Stream every room, then every booking, as JSON Lines.
+
+        Room lines feed POST /rooms/bulk and booking lines (which carry
+        ``roomNo``) feed POST /bookings/bulk.
+        """
+        rooms = list(hotel.rooms)
+
+        def generate():
+            for room in rooms:
+                yield json.dumps({"kind": "room", **room.to_dict()}, ensure_ascii=False) + "\n"
+            for room in rooms:
+                for booking in hotel.get_bookings(room.number):
+                    yield json.dumps(
+                        {"kind": "booking", "roomNo": room.number, **booking.to_dict()},
+                        ensure_ascii=False,
+                    ) + "\n"
+
+        return Response(
+            generate(),
+            mimetype="application/x-ndjson",
+            headers={"Content-Disposition": "attachment; filename=hotel-export.jsonl"},
+        )
+
     @app.post("/rooms/<room_no>/book")
     def book_room(room_no: str):
         data = request.get_json(force=True)
-        guest = (data.get("guestName") or "").strip()
-        check_in = data.get("checkIn")
-        check_out = data.get("checkOut")
-        if not guest or not check_in or not check_out:
-            return jsonify({"error": "guestName, checkIn, checkOut required"}), 400
-        
-        # Generate confirmation number
-        import random
-        import string
-        confirmation = ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
-        
         try:
-            booking = Booking(
-                guest_name=guest,
-                check_in=check_in,
-                check_out=check_out,
-                guest_email=data.get("guestEmail"),
-                guest_phone=data.get("guestPhone"),
-                guest_count=data.get("guestCount", 1),
-                confirmation_number=confirmation,
-                notes=data.get("notes")
-            )
+            booking = new_booking(data)
             hotel.book_room(str(room_no), booking)
             persist()
-            return jsonify({"ok": True, "confirmationNumber": confirmation}), 200
+            notify("booked", room_no, booking=booking.to_dict())
+            return jsonify({"ok": True, "confirmationNumber": booking.confirmation_number}), 200
         except (LookupError, ValueError) as e:
             return jsonify({"error": str(e)}), 400
 
@@ -109,6 +590,7 @@ def create_app(data_path: Path | None = None) -> Flask:
         try:
             hotel.unbook_room(str(room_no))
             persist()
+            notify("unbooked", room_no)
             return jsonify({"ok": True}), 200
         except LookupError as e:
             return jsonify({"error": str(e)}), 404
@@ -119,112 +601,134 @@ def create_app(data_path: Path | None = None) -> Flask:
         price = data.get("price")
         rtype = data.get("type")
         
-        room = hotel.get_room(str(room_no))
-        if room is None:
-            return jsonify({"error": "Room not found"}), 404
-        
-        if room.is_booked:
-            return jsonify({"error": "Cannot update booked room"}), 400
-        
-        if price is not None:
-            room.price = float(price)
-        
-        if rtype:
-            # Create new room instance with updated type
-            cls_map = {
-                "SingleRoom": SingleRoom,
-                "DoubleRoom": DoubleRoom,
-                "SuiteRoom": SuiteRoom,
-            }
-            cls = cls_map.get(rtype)
-            if cls is None:
-                return jsonify({"error": "Invalid room type"}), 400
+        # hold the room lock so a concurrent booking can't slip in between
+        # the is_booked check and the update
+        with hotel.room_lock(room_no):
+            room = hotel.get_room(str(room_no))
+            if room is None:
+                return jsonify({"error": "Room not found"}), 404
+            
+            if room.is_booked:
+                return jsonify({"error": "Cannot update booked room"}), 400
             
-            # Replace room in list
-            index = hotel.rooms.index(room)
-            new_room = cls(room.number, room.price)
-            hotel.rooms[index] = new_room
+            try:
+                cls = room_class(rtype) if rtype else None
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            
+            if price is not None:
+                hotel.set_room_price(room.number, float(price))
+            
+            if cls is not None:
+                # Replace room in list
+                new_room = cls(room.number, room.price)
+                hotel.replace_room(room, new_room)
+            # read back before releasing the lock: the room may be deleted after
+            room = hotel.get_room(str(room_no))
+            body, payload = serializer.encode(room), room.to_dict()
         
         persist()
-        return jsonify(room_to_public(hotel.get_room(str(room_no)))), 200
+        notify("room_updated", room_no, room=payload)
+        return json_response(body)
 
     @app.delete("/rooms/<room_no>")
     def delete_room(room_no: str):
-        room = hotel.get_room(str(room_no))
-        if room is None:
-            return jsonify({"error": "Room not found"}), 404
-        
-        if room.is_booked:
-            return jsonify({"error": "Cannot delete booked room. Unbook it first"}), 400
-        
-        hotel.rooms.remove(room)
+        with hotel.room_lock(room_no):
+            room = hotel.get_room(str(room_no))
+            if room is None:
+                return jsonify({"error": "Room not found"}), 404
+            
+            if room.is_booked:
+                return jsonify({"error": "Cannot delete booked room. Unbook it first"}), 400
+            
+            hotel.remove_room(room)
         persist()
+        notify("room_removed", room_no)
         return jsonify({"ok": True}), 200
 
     @app.get("/stats")
+    @cached_read
     def get_stats():
-        total_rooms = len(hotel.rooms)
-        available = len(hotel.get_available_rooms())
-        booked = len(hotel.get_booked_rooms())
-        
-        # Calculate revenue from bookings
-        revenue = 0
-        for room_no, booking in hotel._bookings.items():
-            room = hotel.get_room(room_no)
-            if room:
-                check_in = datetime.fromisoformat(booking.check_in)
-                check_out = datetime.fromisoformat(booking.check_out)
-                days = (check_out - check_in).days
-                revenue += room.price * days
-        
-        occupancy_rate = (booked / total_rooms * 100) if total_rooms > 0 else 0
-        
-        return jsonify({
-            "totalRooms": total_rooms,
-            "availableRooms": available,
-            "bookedRooms": booked,
-            "revenue": revenue,
-            "occupancyRate": round(occupancy_rate, 2)
-        })
+        if app.config["CHECK_STATS"]:
+            hotel.verify_stats()
+        return jsonify(hotel.get_stats())
+
+    @app.get("/metrics")
+    def get_metrics():
+        """Counters and histograms in the Prometheus text format."""
+        if not app.config["METRICS"]:
+            return jsonify({"error": "Metrics are disabled (HOTEL_METRICS=0)"}), 404
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+    @app.get("/metrics/profile")
+    def get_profile():
+        """Top functions by cumulative time per route: ``?route=GET /rooms&top=20``."""
+        if profiler is None:
+            return jsonify({"error": "Profiling is off; set HOTEL_PROFILE_EVERY"}), 404
+        try:
+            top = int(request.args.get("top", 20))
+        except ValueError:
+            return jsonify({"error": "top must be an integer"}), 400
+        return Response(profiler.report(top, request.args.get("route")), mimetype="text/plain")
+
+    @app.get("/persistence")
+    def persistence_stats():
+        """Persistence mode, pending saves and flush latency."""
+        return jsonify(scheduler.stats())
+
+    @app.get("/analytics")
+    @cached_read
+    def get_analytics():
+        """Daily occupancy, ADR and RevPAR for ``from``..``to`` (inclusive)."""
+        if analytics is None:
+            return jsonify({"error": "Analytics requires numpy"}), 501
+        try:
+            first = date.fromisoformat(request.args.get("from", ""))
+            last = date.fromisoformat(request.args.get("to", ""))
+        except ValueError:
+            return jsonify({"error": "from and to must be dates (YYYY-MM-DD)"}), 400
+        try:
+            report = analytics.report(first, last, request.args.get("groupBy", "type"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(report)
 
     @app.post("/rooms/<room_no>/checkin")
     def checkin_room(room_no: str):
-        room = hotel.get_room(str(room_no))
-        if room is None:
-            return jsonify({"error": "Room not found"}), 404
-        if not room.is_booked:
-            return jsonify({"error": "Room is not booked"}), 400
-        if room_no not in hotel._bookings:
-            return jsonify({"error": "Booking not found"}), 404
-        
-        booking = hotel._bookings[room_no]
-        if booking.checked_in:
-            return jsonify({"error": "Guest already checked in"}), 400
-        
-        booking.checked_in = True
-        booking.check_in_time = datetime.now().isoformat()
+        with hotel.room_lock(room_no):
+            try:
+                booking = check_in(str(room_no))
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         persist()
+        notify("checked_in", room_no, checkInTime=booking.check_in_time)
         return jsonify({"ok": True, "checkInTime": booking.check_in_time}), 200
 
     @app.post("/rooms/<room_no>/checkout")
     def checkout_room(room_no: str):
-        room = hotel.get_room(str(room_no))
-        if room is None:
-            return jsonify({"error": "Room not found"}), 404
-        if not room.is_booked:
-            return jsonify({"error": "Room is not booked"}), 400
-        if room_no not in hotel._bookings:
-            return jsonify({"error": "Booking not found"}), 404
-        
-        booking = hotel._bookings[room_no]
-        if booking.checked_out:
-            return jsonify({"error": "Guest already checked out"}), 400
-        
-        booking.checked_out = True
-        booking.check_out_time = datetime.now().isoformat()
-        # Auto unbook after checkout
-        hotel.unbook_room(str(room_no))
+        with hotel.room_lock(room_no):
+            room = hotel.get_room(str(room_no))
+            if room is None:
+                return jsonify({"error": "Room not found"}), 404
+            if not room.is_booked:
+                return jsonify({"error": "Room is not booked"}), 400
+            if room_no not in hotel._bookings:
+                return jsonify({"error": "Booking not found"}), 404
+            
+            booking = hotel._bookings[room_no]
+            if booking.checked_out:
+                return jsonify({"error": "Guest already checked out"}), 400
+            
+            hotel.update_booking(
+                room_no, checked_out=True, check_out_time=datetime.now().isoformat()
+            )
+            # Auto unbook after checkout; the stay lives on in the archive
+            hotel.add_guest_history([archive.append(room, booking)])
+            hotel.unbook_room(str(room_no))
         persist()
+        notify("checked_out", room_no, checkOutTime=booking.check_out_time)
         return jsonify({"ok": True, "checkOutTime": booking.check_out_time}), 200
 
     @app.put("/rooms/<room_no>/status")
@@ -233,122 +737,245 @@ def create_app(data_path: Path | None = None) -> Flask:
         status = data.get("status")
         notes = data.get("notes")
         
-        room = hotel.get_room(str(room_no))
-        if room is None:
-            return jsonify({"error": "Room not found"}), 404
-        
-        if status and status in ["available", "maintenance", "cleaning"]:
-            room.status = status
-        if notes is not None:
-            room.notes = notes
+        with hotel.room_lock(room_no):
+            room = hotel.get_room(str(room_no))
+            if room is None:
+                return jsonify({"error": "Room not found"}), 404
+            
+            hotel.set_room_status(room.number, room_status(status), notes)
+            status, notes, body = room.status, room.notes, serializer.encode(room)
         
         persist()
-        return jsonify(room_to_public(room)), 200
+        notify("status_changed", room_no, status=status, notes=notes)
+        return json_response(body)
 
     @app.put("/rooms/<room_no>/amenities")
     def update_room_amenities(room_no: str):
         data = request.get_json(force=True)
-        amenities = data.get("amenities", [])
-        
-        room = hotel.get_room(str(room_no))
-        if room is None:
-            return jsonify({"error": "Room not found"}), 404
+        try:
+            amenities = amenity_list(data.get("amenities", []))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        room.amenities = amenities if isinstance(amenities, list) else []
+        with hotel.room_lock(room_no):
+            room = hotel.get_room(str(room_no))
+            if room is None:
+                return jsonify({"error": "Room not found"}), 404
+            
+            hotel.set_room_amenities(room.number, amenities)
+            amenities, body = room.amenities, serializer.encode(room)
         persist()
-        return jsonify(room_to_public(room)), 200
+        notify("amenities_changed", room_no, amenities=amenities)
+        return json_response(body)
 
     @app.put("/rooms/<room_no>/booking")
     def modify_booking(room_no: str):
         data = request.get_json(force=True)
-        room = hotel.get_room(str(room_no))
-        if room is None or room_no not in hotel._bookings:
+        try:
+            booking = hotel.update_booking(
+                room_no, data.get("confirmationNumber"), **booking_changes(data)
+            )
+        except LookupError:
             return jsonify({"error": "Booking not found"}), 404
-        
-        booking = hotel._bookings[room_no]
-        
-        if "checkIn" in data:
-            booking.check_in = data["checkIn"]
-        if "checkOut" in data:
-            booking.check_out = data["checkOut"]
-        if "guestCount" in data:
-            booking.guest_count = data["guestCount"]
-        if "notes" in data:
-            booking.notes = data["notes"]
-        if "guestEmail" in data:
-            booking.guest_email = data["guestEmail"]
-        if "guestPhone" in data:
-            booking.guest_phone = data["guestPhone"]
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         persist()
+        notify("booking_updated", room_no, booking=booking.to_dict())
         return jsonify({"ok": True}), 200
 
+    @app.get("/rooms/<room_no>/bookings")
+    def list_room_bookings(room_no: str):
+        if hotel.get_room(room_no) is None:
+            return jsonify({"error": "Room not found"}), 404
+        return jsonify([b.to_dict() for b in hotel.get_bookings(room_no)])
+
+    @app.delete("/rooms/<room_no>/bookings/<confirmation>")
+    def cancel_booking(room_no: str, confirmation: str):
+        try:
+            hotel.cancel_booking(room_no, confirmation)
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        persist()
+        notify("booking_cancelled", room_no, confirmationNumber=confirmation)
+        return jsonify({"ok": True}), 200
+
+    @app.get("/bookings/<confirmation>")
+    def get_booking(confirmation: str):
+        found = hotel.find_confirmation(confirmation)
+        if found is not None:
+            room_no, booking = found
+            return jsonify({"roomNo": room_no, "archived": False, **booking.to_dict()})
+        record = archive.get(confirmation)
+        if record is None:
+            return jsonify({"error": "Booking not found"}), 404
+        return jsonify({**record, "archived": True})
+
+    @app.get("/history")
+    def booking_history():
+        """Stream archived stays checked out in months ``from``..``to`` as JSON Lines."""
+        first, last = request.args.get("from"), request.args.get("to")
+        try:
+            for month in (first, last):
+                if month:
+                    datetime.strptime(month, "%Y-%m")
+        except ValueError:
+            return jsonify({"error": "from and to must be months (YYYY-MM)"}), 400
+
+        def generate():
+            for record in archive.scan(first, last):
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    @app.get("/availability")
+    def search_availability():
+        try:
+            start, end = parse_stay(request.args.get("from"), request.args.get("to"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        rooms = hotel.find_available_rooms(start, end)
+        rtype = request.args.get("type")
+        if rtype:
+            rooms = [r for r in rooms if r.type == rtype]
+        return json_response(serializer.encode_list(rooms))
+
+    @app.get("/events")
+    def stream_events():
+        """Server-sent events describing every room/booking change.
+
+        Reconnecting clients send Last-Event-ID (or ?lastEventId=) and get
+        the events they missed; a ``resync`` event means the gap could not
+        be replayed (or the id is from before a restart) and the client
+        should refetch its data.
+        """
+        last_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+        try:
+            sub = events.subscribe(last_id or None)
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID must look like <epoch>-<n>"}), 400
+
+        def generate():
+            try:
+                yield "retry: 3000\n\n"
+                while True:
+                    event = sub.get(timeout=15)
+                    if event is None:
+                        yield ": keep-alive\n\n"
+                        continue
+                    yield event.to_sse()
+                    if event.type == "resync":
+                        return
+            finally:
+                events.unsubscribe(sub)
+
+        return Response(
+            generate(),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     @app.get("/guests")
+    @cached_read
     def list_guests():
-        guests = {}
-        for room_no, booking in hotel._bookings.items():
-            guest_name = booking.guest_name
-            if guest_name not in guests:
-                guests[guest_name] = {
-                    "name": guest_name,
-                    "email": booking.guest_email,
-                    "phone": booking.guest_phone,
-                    "totalBookings": 0,
-                    "bookings": []
-                }
-            guests[guest_name]["totalBookings"] += 1
-            guests[guest_name]["bookings"].append({
-                "roomNo": room_no,
-                "checkIn": booking.check_in,
-                "checkOut": booking.check_out,
-                "confirmationNumber": booking.confirmation_number,
-                "checkedIn": booking.checked_in,
-                "checkedOut": booking.checked_out
-            })
-        return jsonify(list(guests.values()))
+        """Guests from the directory (current and past), ordered by name.
+
+        Optional ``limit``/``offset`` page the list; ``X-Total-Count`` has the
+        full size.
+        """
+        try:
+            offset, limit = page_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        guests, total = hotel.guests.list(offset, limit)
+        response = jsonify([g.to_dict() for g in guests])
+        response.headers["X-Total-Count"] = str(total)
+        return response
+
+    @app.get("/guests/search")
+    @cached_read
+    def search_guests():
+        """Find guests by name, email or phone: ``?q=ann&prefix=1&limit=20``.
+
+        Matches substrings by default (three characters or more), or
+        prefixes with ``prefix=1``.
+        """
+        query = request.args.get("q", "")
+        try:
+            offset, limit = page_args(default_limit=50)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        prefix = request.args.get("prefix") in ("1", "true")
+        guests, total = hotel.guests.search(query, prefix=prefix, offset=offset, limit=limit)
+        response = jsonify([g.to_dict() for g in guests])
+        response.headers["X-Total-Count"] = str(total)
+        return response
 
     @app.get("/notifications")
+    @cached_read
     def get_notifications():
         notifications = []
+        # buckets are keyed by absolute date, so a new day needs no rebuild
         today = datetime.now().date()
         
-        for room_no, booking in hotel._bookings.items():
-            check_out_date = datetime.fromisoformat(booking.check_out).date()
-            days_until_checkout = (check_out_date - today).days
-            
-            if days_until_checkout == 0 and not booking.checked_out:
+        for room_no, booking in hotel.checkouts_on(today):
+            if not booking.checked_out:
                 notifications.append({
                     "type": "checkout_today",
                     "message": f"Room {room_no} checkout today - Guest: {booking.guest_name}",
                     "roomNo": room_no,
                     "priority": "high"
                 })
-            elif days_until_checkout == 1:
-                notifications.append({
-                    "type": "checkout_tomorrow",
-                    "message": f"Room {room_no} checkout tomorrow - Guest: {booking.guest_name}",
-                    "roomNo": room_no,
-                    "priority": "medium"
-                })
+        for room_no, booking in hotel.checkouts_on(today + timedelta(days=1)):
+            notifications.append({
+                "type": "checkout_tomorrow",
+                "message": f"Room {room_no} checkout tomorrow - Guest: {booking.guest_name}",
+                "roomNo": room_no,
+                "priority": "medium"
+            })
         
         # Check for maintenance rooms
-        for room in hotel.rooms:
-            if room.status == "maintenance":
-                notifications.append({
-                    "type": "maintenance",
-                    "message": f"Room {room.number} is under maintenance",
-                    "roomNo": room.number,
-                    "priority": "medium"
-                })
+        maintenance, _, _ = hotel.query_rooms(status="maintenance")
+        for room in maintenance:
+            notifications.append({
+                "type": "maintenance",
+                "message": f"Room {room.number} is under maintenance",
+                "roomNo": room.number,
+                "priority": "medium"
+            })
         
         return jsonify(notifications)
 
+    # ---------- Frontend ----------
+    bundle = FrontendBundle.load(app.config["FRONTEND_DIR"])
+
+    def serve_asset(name: str):
+        """Best precompressed variant of a bundle file, with its cache policy."""
+        chosen = bundle.select(name, request.accept_encodings)
+        if chosen is None:
+            return jsonify({"error": "Not found"}), 404
+        body, encoding = chosen
+        mimetype = "text/html" if name.endswith(".html") else "text/javascript"
+        resp = Response(body, mimetype=mimetype)
+        if encoding:
+            resp.headers["Content-Encoding"] = encoding
+        resp.headers["Vary"] = "Accept-Encoding"
+        resp.headers["Cache-Control"] = bundle.cache_control(name)
+        resp.set_etag(bundle.etags[name] + ("-" + encoding if encoding else ""))
+        return resp.make_conditional(request)
+
+    if bundle is not None:
+        app.add_url_rule("/", "frontend_index", lambda: serve_asset("index.html"))
+        app.add_url_rule(
+            "/assets/<name>", "frontend_asset", lambda name: serve_asset(f"assets/{name}")
+        )
+
     return app
 
 
 if __name__ == "__main__":
     # Local dev entrypoint: python -m backend.app
     app = create_app()
-    app.run(host="127.0.0.1", port=5000, debug=True)
+    app.run(host="127.0.0.1", port=5000, debug=True, threaded=True)
 
 
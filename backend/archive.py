@@ -0,0 +1,270 @@
+from __future__ import annotations
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models import AbstractRoom, Booking
+
+# one fixed-width row per archived booking in ``<month>.stays``: end offset
+# of its record in the segment, check-in and check-out ordinals (0 when
+# malformed), nightly price and room type, for columnar readers
+STAY_ROW = struct.Struct("<qiid16s")
+
+
+class BookingArchive:
+    """Completed bookings, append-only and segmented by month.
+
+    Each month of check-outs is a JSON Lines file (``2025-11.jsonl``) with a
+    sidecar index (``2025-11.idx``) of ``<confirmation> <offset> <length>``
+    lines and a sidecar of :data:`STAY_ROW` rows (``2025-11.stays``). Only
+    the confirmation -> (month, offset, length) map is held in memory;
+    records are read through a memory map of their segment, so lookups and
+    scans never load history as a whole.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # serializes appends; reads go through the maps without it
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[str, int, int]] = {}
+        # month -> read-only map of its segment, remapped when it has grown
+        self._maps: Dict[str, mmap.mmap] = {}
+        for path in sorted(self.directory.glob("*.jsonl")):
+            self._load_segment(path.stem)
+
+    def _path(self, month: str, suffix: str) -> Path:
+        return self.directory / f"{month}{suffix}"
+
+    def _load_segment(self, month: str) -> None:
+        path = self._path(month, ".jsonl")
+        data = self._map(month)
+        if data is not None and data[-1:] != b"\n":
+            # drop a record torn by a crash so the next append starts clean
+            cut = data.rfind(b"\n") + 1
+            self._maps.pop(month).close()
+            os.truncate(path, cut)
+        size = path.stat().st_size
+        covered = 0
+        idx_path = self._path(month, ".idx")
+        if idx_path.exists():
+            with idx_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        confirmation, offset, length = line.rstrip("\n").rsplit(" ", 2)
+                        entry = (month, int(offset), int(length))
+                    except ValueError:
+                        continue  # torn last line
+                    if entry[1] + entry[2] > size:
+                        continue
+                    self._index[confirmation] = entry
+                    covered = max(covered, entry[1] + entry[2])
+        # records appended after the last index write (crash in between):
+        # index them now so the two files agree again
+        missing = []
+        for offset, raw in self._lines(month, covered):
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if record.get("confirmationNumber"):
+                missing.append((record["confirmationNumber"], offset, len(raw) + 1))
+        if missing:
+            with idx_path.open("a", encoding="utf-8") as f:
+                for confirmation, offset, length in missing:
+                    f.write(f"{confirmation} {offset} {length}\n")
+                    self._index[confirmation] = (month, offset, length)
+        self._repair_stays(month, size)
+
+    def _repair_stays(self, month: str, size: int) -> None:
+        """Bring ``<month>.stays`` level with the segment after a crash."""
+        stays_path = self._path(month, ".stays")
+        rows = stays_path.stat().st_size // STAY_ROW.size if stays_path.exists() else 0
+        covered = 0
+        with stays_path.open("a+b") as f:
+            if rows:
+                f.truncate(rows * STAY_ROW.size)  # torn last row
+                f.seek((rows - 1) * STAY_ROW.size)
+                covered = STAY_ROW.unpack(f.read(STAY_ROW.size))[0]
+                f.seek(0, os.SEEK_END)
+            if covered < size:
+                for offset, raw in self._lines(month, covered):
+                    try:
+                        record = json.loads(raw)
+                    except ValueError:
+                        continue
+                    f.write(_stay_row(record, offset + len(raw) + 1))
+
+    # -------- writes --------
+    def append(self, room: AbstractRoom, booking: Booking) -> Dict[str, Any]:
+        """Archive a completed booking together with the room it was in."""
+        record = {
+            "roomNo": room.number,
+            "roomType": room.type,
+            "price": room.price,
+            **booking.to_dict(),
+        }
+        month = (booking.check_out_time or date.today().isoformat())[:7]
+        line = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        confirmation = booking.confirmation_number
+        with self._lock:
+            with self._path(month, ".jsonl").open("ab") as f:
+                offset = f.tell()
+                f.write(line)
+            with self._path(month, ".stays").open("ab") as f:
+                f.write(_stay_row(record, offset + len(line)))
+            if confirmation:
+                # data first, then sidecars: a crash in between is repaired on load
+                with self._path(month, ".idx").open("a", encoding="utf-8") as f:
+                    f.write(f"{confirmation} {offset} {len(line)}\n")
+                self._index[confirmation] = (month, offset, len(line))
+        return record
+
+    # -------- reads --------
+    def _map(self, month: str, needed: Optional[int] = None) -> Optional[mmap.mmap]:
+        """Map of a segment covering at least ``needed`` bytes (default: all of it)."""
+        path = self._path(month, ".jsonl")
+        if needed is None:
+            needed = path.stat().st_size if path.exists() else 0
+        current = self._maps.get(month)
+        if current is not None and len(current) >= needed:
+            return current
+        if needed == 0:
+            return None
+        with path.open("rb") as f:
+            # the previous map is left to the garbage collector, since
+            # a scan may still be iterating over it
+            current = self._maps[month] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return current
+
+    def _lines(self, month: str, start: int) -> Iterator[Tuple[int, bytes]]:
+        """(offset, line without newline) of the segment from ``start`` on."""
+        data = self._map(month)
+        if data is None:
+            return
+        pos = start
+        while pos < len(data):
+            end = data.find(b"\n", pos)
+            if end < 0:
+                break  # record still being appended
+            if end > pos:
+                yield pos, data[pos:end]
+            pos = end + 1
+
+    def get(self, confirmation: str) -> Optional[Dict[str, Any]]:
+        entry = self._index.get(confirmation)
+        if entry is None:
+            return None
+        month, offset, length = entry
+        data = self._map(month, offset + length)
+        return json.loads(data[offset:offset + length])
+
+    def stays_size(self, month: str) -> int:
+        """Size of the month's stay rows; grows with every append."""
+        path = self._path(month, ".stays")
+        return path.stat().st_size if path.exists() else 0
+
+    def stay_rows(self, month: str) -> bytes:
+        """The month's :data:`STAY_ROW` rows, e.g. for ``numpy.frombuffer``."""
+        path = self._path(month, ".stays")
+        data = path.read_bytes() if path.exists() else b""
+        return data[:len(data) - len(data) % STAY_ROW.size]
+
+    def months(self) -> List[str]:
+        return sorted(path.stem for path in self.directory.glob("*.jsonl"))
+
+    def scan(self, first: Optional[str] = None, last: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Archived bookings of the months ``first``..``last`` (``YYYY-MM``), oldest first."""
+        for month in self.months():
+            if (first and month < first) or (last and month > last):
+                continue
+            for _, raw in self._lines(month, 0):
+                yield json.loads(raw)
+
+    def columns(self, first: Optional[str] = None, last: Optional[str] = None) -> BookingColumns:
+        """Like :meth:`scan`, loaded into a compact :class:`BookingColumns`."""
+        return BookingColumns(self.scan(first, last))
+
+    def close(self) -> None:
+        for data in self._maps.values():
+            data.close()
+        self._maps.clear()
+
+
+class BookingColumns:
+    """Archived bookings as typed columns, for aggregating over history.
+
+    Keeps the fields analytics needs in ``array`` columns (a few bytes per
+    booking instead of a dict of strings): room and room type as codes
+    into small lookup lists, price, stay dates as ordinals (0 when
+    malformed) and guest count. Guest details stay in the archive.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()) -> None:
+        self.room_numbers: List[str] = []
+        self.room_types: List[str] = []
+        self._codes: Dict[Tuple[str, str], int] = {}
+        self.room = array("I")
+        self.room_type = array("B")
+        self.price = array("d")
+        self.check_in = array("i")
+        self.check_out = array("i")
+        self.guest_count = array("H")
+        for record in records:
+            self.append(record)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def _code(self, kind: str, value: str, values: List[str]) -> int:
+        code = self._codes.get((kind, value))
+        if code is None:
+            code = self._codes[(kind, value)] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.room.append(self._code("room", str(record["roomNo"]), self.room_numbers))
+        self.room_type.append(self._code("type", record.get("roomType") or "", self.room_types))
+        self.price.append(float(record.get("price") or 0.0))
+        self.check_in.append(_ordinal(record.get("checkIn")))
+        self.check_out.append(_ordinal(record.get("checkOut")))
+        self.guest_count.append(min(int(record.get("guestCount") or 1), 0xFFFF))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """The stored fields of one booking, keyed as in ``Booking.to_dict``."""
+        return {
+            "roomNo": self.room_numbers[self.room[i]],
+            "roomType": self.room_types[self.room_type[i]],
+            "price": self.price[i],
+            "checkIn": _iso(self.check_in[i]),
+            "checkOut": _iso(self.check_out[i]),
+            "guestCount": self.guest_count[i],
+        }
+
+
+def _stay_row(record: Dict[str, Any], end: int) -> bytes:
+    return STAY_ROW.pack(
+        end,
+        _ordinal(record.get("checkIn")),
+        _ordinal(record.get("checkOut")),
+        float(record.get("price") or 0.0),
+        (record.get("roomType") or "").encode("utf-8")[:16],
+    )
+
+
+def _ordinal(value: Any) -> int:
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def _iso(ordinal: int) -> Optional[str]:
+    return date.fromordinal(ordinal).isoformat() if ordinal else None
@@ -0,0 +1,288 @@
+"""Multi-property mode: one Hotel per property, sharded over worker processes.
+
+Each property lives in its own directory under the chain root
+(``<root>/<property id>/data.json``, plus whatever its storage backend
+keeps beside it) and is served by the ordinary :func:`app.create_app`.
+Properties are spread over worker processes by a hash of their ID; every
+worker runs a threaded HTTP server on a local port for the properties it
+owns. The router app in front forwards ``/properties/<id>/...`` to the
+owning worker and answers chain-wide ``/stats`` by asking every property
+in parallel.
+
+Run from the project root:
+
+    python backend/chain.py --root backend/properties --workers 4
+"""
+from __future__ import annotations
+import argparse
+import atexit
+import http.client
+import json
+import logging
+import multiprocessing
+import re
+import signal
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, Response, jsonify, request
+from flask_cors import CORS
+
+PROPERTY_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# not passed through the router in either direction
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te",
+    "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+
+def shard_of(property_id: str, workers: int) -> int:
+    """Worker that owns a property; stable across restarts."""
+    return zlib.crc32(property_id.encode("utf-8")) % workers
+
+
+def list_properties(root: Path) -> List[str]:
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if p.is_dir() and PROPERTY_ID.match(p.name))
+
+
+# -------- Worker side --------
+class ShardDispatcher:
+    """WSGI app of one worker: routes ``/properties/<id>/...`` to that property's app.
+
+    Apps are created on first use; the property prefix moves into
+    ``SCRIPT_NAME`` so the property app sees its usual paths.
+    """
+
+    def __init__(self, root: Path, index: int, workers: int) -> None:
+        self.root = root
+        self.index = index
+        self.workers = workers
+        self._apps: Dict[str, Flask] = {}
+        self._lock = threading.Lock()
+
+    def _app(self, property_id: str) -> Optional[Flask]:
+        app = self._apps.get(property_id)
+        if app is not None:
+            return app
+        if shard_of(property_id, self.workers) != self.index:
+            return None
+        directory = self.root / property_id
+        if not directory.is_dir():
+            return None
+        with self._lock:
+            app = self._apps.get(property_id)
+            if app is None:
+                # imported here: the router process never loads a hotel
+                from app import create_app
+                app = self._apps[property_id] = create_app(directory / "data.json")
+        return app
+
+    def __call__(self, environ, start_response):
+        parts = environ.get("PATH_INFO", "").split("/", 3)
+        app = None
+        if len(parts) >= 3 and parts[1] == "properties" and PROPERTY_ID.match(parts[2]):
+            app = self._app(parts[2])
+        if app is None:
+            body = b'{"error":"Property not found"}'
+            start_response("404 NOT FOUND", [
+                ("Content-Type", "application/json"), ("Content-Length", str(len(body))),
+            ])
+            return [body]
+        environ = dict(environ)
+        environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + f"/properties/{parts[2]}"
+        environ["PATH_INFO"] = "/" + (parts[3] if len(parts) > 3 else "")
+        return app(environ, start_response)
+
+
+def _worker_main(root: str, index: int, workers: int, conn) -> None:
+    from werkzeug.serving import make_server
+
+    # exit through SystemExit so every app's atexit flush still runs
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    # the router already logs every request
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, ShardDispatcher(Path(root), index, workers), threaded=True)
+    conn.send(server.server_port)
+    conn.close()
+    server.serve_forever()
+
+
+class WorkerPool:
+    """The worker processes and the local port each one listens on.
+
+    A worker found dead when a request is routed to it is started again
+    (on a new port) before the request is forwarded.
+    """
+
+    def __init__(self, root: Path, workers: int) -> None:
+        self.root = root
+        self.workers = workers
+        self.ports: List[int] = []
+        self.restarts = 0
+        self._processes: List[multiprocessing.Process] = []
+        self._lock = threading.Lock()
+        # spawn: the router has threads running, which fork does not mix with
+        self._ctx = multiprocessing.get_context("spawn")
+        for index in range(workers):
+            process, port = self._start(index)
+            self._processes.append(process)
+            self.ports.append(port)
+
+    def _start(self, index: int) -> Tuple[multiprocessing.Process, int]:
+        parent, child = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main, args=(str(self.root), index, self.workers, child),
+            name=f"hotel-shard-{index}", daemon=True,
+        )
+        process.start()
+        child.close()
+        try:
+            # raises EOFError if the worker dies before it is listening
+            port = parent.recv()
+        finally:
+            parent.close()
+        return process, port
+
+    def port_for(self, property_id: str) -> int:
+        index = shard_of(property_id, self.workers)
+        if not self._processes[index].is_alive():
+            with self._lock:
+                if not self._processes[index].is_alive():
+                    self._processes[index].join()
+                    try:
+                        self._processes[index], self.ports[index] = self._start(index)
+                    except EOFError:
+                        raise ConnectionError(f"worker {index} failed to start") from None
+                    self.restarts += 1
+        return self.ports[index]
+
+    def close(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+
+# -------- Router --------
+def create_chain_app(root: Path, workers: int = 4, timeout: float = 30.0) -> Flask:
+    app = Flask(__name__)
+    CORS(app, expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"])
+    root = root.resolve()
+    root.mkdir(parents=True, exist_ok=True)
+    pool = WorkerPool(root, workers)
+    atexit.register(pool.close)
+    app.config["WORKER_POOL"] = pool
+
+    def call(property_id: str, method: str, path: str, body: Optional[bytes] = None,
+             headers: Optional[Dict[str, str]] = None) -> Tuple[http.client.HTTPConnection, Any]:
+        conn = http.client.HTTPConnection("127.0.0.1", pool.port_for(property_id), timeout=timeout)
+        conn.request(method, f"/properties/{property_id}{path}", body=body, headers=headers or {})
+        return conn, conn.getresponse()
+
+    def fetch_json(property_id: str, path: str) -> Tuple[int, Any]:
+        """(status, body); status 502 when the worker cannot be reached."""
+        try:
+            conn, response = call(property_id, "GET", path)
+        except (OSError, http.client.HTTPException):
+            return 502, None
+        try:
+            return response.status, json.loads(response.read())
+        except (OSError, http.client.HTTPException, ValueError):
+            return 502, None
+        finally:
+            conn.close()
+
+    def unreachable(property_ids: List[str]):
+        return jsonify({"error": "Some properties did not answer", "properties": property_ids}), 502
+
+    @app.get("/properties")
+    def get_properties():
+        return jsonify([
+            {"id": pid, "worker": shard_of(pid, workers)} for pid in list_properties(root)
+        ])
+
+    @app.post("/properties")
+    def add_property():
+        data = request.get_json(force=True)
+        pid = str(data.get("id", "")).strip()
+        if not PROPERTY_ID.match(pid):
+            return jsonify({"error": "id must be 1-64 letters, digits, '-' or '_'"}), 400
+        try:
+            (root / pid).mkdir()
+        except FileExistsError:
+            return jsonify({"error": "Property already exists"}), 409
+        return jsonify({"id": pid, "worker": shard_of(pid, workers)}), 201
+
+    @app.route(
+        "/properties/<pid>/<path:rest>",
+        methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
+    )
+    def forward(pid: str, rest: str):
+        """Pass the request to the worker owning ``pid`` and stream its answer back."""
+        if not PROPERTY_ID.match(pid) or not (root / pid).is_dir():
+            return jsonify({"error": "Property not found"}), 404
+        path = "/" + rest
+        if request.query_string:
+            path += "?" + request.query_string.decode("latin-1")
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_HEADERS}
+        try:
+            conn, response = call(pid, request.method, path, request.get_data(), headers)
+        except (OSError, http.client.HTTPException):
+            return unreachable([pid])
+
+        def generate():
+            # read1 returns what has arrived, so event streams stay live
+            try:
+                while chunk := response.read1(65536):
+                    yield chunk
+            finally:
+                conn.close()
+
+        return Response(
+            generate(),
+            status=response.status,
+            headers=[(k, v) for k, v in response.getheaders() if k.lower() not in HOP_HEADERS],
+        )
+
+    @app.get("/stats")
+    def chain_stats():
+        """Statistics of every property, gathered in parallel, plus chain totals."""
+        properties = list_properties(root)
+        if not properties:
+            return jsonify({"totalRooms": 0, "availableRooms": 0, "bookedRooms": 0,
+                            "revenue": 0, "occupancyRate": 0, "properties": {}})
+        with ThreadPoolExecutor(min(len(properties), 32)) as gather:
+            answers = list(gather.map(lambda pid: fetch_json(pid, "/stats"), properties))
+        failed = [pid for pid, (status, _) in zip(properties, answers) if status != 200]
+        if failed:
+            return unreachable(failed)
+        per_property = {pid: stats for pid, (_, stats) in zip(properties, answers)}
+        total = sum(s["totalRooms"] for s in per_property.values())
+        booked = sum(s["bookedRooms"] for s in per_property.values())
+        return jsonify({
+            "totalRooms": total,
+            "availableRooms": sum(s["availableRooms"] for s in per_property.values()),
+            "bookedRooms": booked,
+            "revenue": round(sum(s["revenue"] for s in per_property.values()), 2),
+            "occupancyRate": round(booked / total * 100, 2) if total > 0 else 0,
+            "properties": per_property,
+        })
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve many properties from worker processes.")
+    parser.add_argument("--root", type=Path, default=Path(__file__).parent / "properties")
+    parser.add_argument("--workers", type=int, default=max(1, (multiprocessing.cpu_count() or 2) - 1))
+    parser.add_argument("--port", type=int, default=5000)
+    args = parser.parse_args()
+    chain = create_chain_app(args.root, args.workers)
+    chain.run(host="127.0.0.1", port=args.port, threaded=True)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import json
+import os
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Set
+
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    type: str
+    data: Dict[str, Any]
+    epoch: str = ""
+
+    @property
+    def id(self) -> str:
+        """Event id as sent to clients: ``<epoch>-<seq>``."""
+        return f"{self.epoch}-{self.seq}"
+
+    def to_sse(self) -> str:
+        """Wire format of one server-sent event."""
+        payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """One connected client: a bounded queue of events not yet sent."""
+
+    def __init__(self, max_pending: int) -> None:
+        self.queue: "queue.Queue[Event]" = queue.Queue(max_pending)
+        # set once the client fell too far behind; it gets a final resync
+        self.overflowed = False
+
+    def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """Fan-out of change events to server-sent-event subscribers.
+
+    Recent events are kept in a ring buffer so a client reconnecting with
+    ``Last-Event-ID`` receives what it missed. A subscriber whose queue
+    fills up is not allowed to hold back publishers: its queue is replaced
+    by a single ``resync`` event and the stream ends, after which the
+    client reconnects and refetches whatever it shows.
+
+    Sequence numbers restart with the process, so ids carry a random
+    per-process epoch; an id from another epoch always gets a resync.
+    """
+
+    def __init__(self, history: int = 1000, max_pending: int = 256) -> None:
+        self._lock = threading.Lock()
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._subscribers: Set[Subscription] = set()
+        self._max_pending = max_pending
+        self._last_id = 0
+        self.epoch = os.urandom(4).hex()
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, data, self.epoch)
+            self._history.append(event)
+            for sub in list(self._subscribers):
+                try:
+                    sub.queue.put_nowait(event)
+                except queue.Full:
+                    self._overflow(sub)
+        return event
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Register a client, replaying history after ``last_event_id``.
+
+        Raises ValueError when the id's sequence number is not an integer.
+        """
+        sub = Subscription(self._max_pending)
+        if last_event_id is not None:
+            epoch, _, seq = last_event_id.rpartition("-")
+            last_seq = int(seq)
+        with self._lock:
+            if last_event_id is not None and (epoch, last_seq) != (self.epoch, self._last_id):
+                oldest = self._history[0].seq if self._history else self._last_id + 1
+                missed = [e for e in self._history if e.seq > last_seq]
+                if (
+                    epoch != self.epoch  # ids from another process
+                    or last_seq > self._last_id
+                    or last_seq + 1 < oldest
+                    or len(missed) > self._max_pending
+                ):
+                    # can't replay the gap; tell the client to reload
+                    self._overflow(sub)
+                    return sub
+                for event in missed:
+                    sub.queue.put_nowait(event)
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def _overflow(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+        sub.overflowed = True
+        while True:
+            try:
+                sub.queue.get_nowait()
+            except queue.Empty:
+                break
+        sub.queue.put_nowait(Event(self._last_id, "resync", {}, self.epoch))
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
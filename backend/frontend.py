@@ -0,0 +1,247 @@
+"""Build the frontend into a self-contained bundle and serve it.
+
+Run from the project root:
+
+    python backend/frontend.py            # writes dist/
+
+The build inlines the ``components/`` fragments and the stylesheets into
+``index.html`` and concatenates the scripts into one minified
+``assets/app.<hash>.js``. Every file gets a ``.gz`` sibling, and a
+``.br`` one when the ``brotli`` package is installed. A cold page load
+is then two requests: the HTML shell (revalidated by ETag) and the
+script (cached for a year under its content hash).
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # optional; gzip covers every browser
+    brotli = None
+
+ROOT = Path(__file__).resolve().parent.parent
+DIST = ROOT / "dist"
+MANIFEST = "manifest.json"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+PLACEHOLDER = re.compile(r'<div id="([\w-]+)-placeholder"></div>')
+STYLESHEET = re.compile(r'\s*<link rel="stylesheet" href="([^"]+)"\s*/?>')
+SCRIPT = re.compile(r'\s*<script src="([^"]+)"></script>')
+HTML_COMMENT = re.compile(r"\s*<!--.*?-->", re.S)
+# the API client points at the dev server; the bundle is served by it
+API_BASE = "baseURL: 'http://127.0.0.1:5000'"
+
+
+# -------- Minification --------
+CSS_STRING = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+CSS_IMPORT = re.compile(r"""@import\s+(?:url\([^)]*\)|"[^"]*"|'[^']*')[^;]*;""")
+
+
+def minify_css(text: str) -> str:
+    """Drop comments and the whitespace around punctuation, outside strings.
+
+    Space before ``:`` is kept: ``a :hover`` is a descendant selector.
+    """
+    parts = CSS_STRING.split(re.sub(r"/\*.*?\*/", "", text, flags=re.S))
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"\s+", " ", parts[i])
+        part = re.sub(r"\s*([{};,>])\s*", r"\1", part)
+        parts[i] = re.sub(r":\s+", ":", part).replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def minify_js(text: str) -> str:
+    """Drop comments, indentation and blank lines.
+
+    Strings, template literals (including nested ``${...}``) and regex
+    literals are copied verbatim. Line breaks are kept, so automatic
+    semicolon insertion behaves as in the source.
+    """
+    out: List[str] = []
+    # open templates and, for each ${...} inside one, the brace depth
+    stack: List[int] = []
+    depth = 0
+    i, n = 0, len(text)
+    last = ""  # last significant code character, to tell regex from division
+    while i < n:
+        c = text[i]
+        if c in "'\"":
+            j = i + 1
+            while j < n and text[j] != c:
+                j += 2 if text[j] == "\\" else 1
+            out.append(text[i:j + 1])
+            i, last = j + 1, c
+        elif c == "`" or (c == "}" and stack and depth == stack[-1]):
+            # template text, from an opening backtick or the end of a ${...}
+            if c == "}":
+                stack.pop()
+            j = i + 1
+            while j < n and text[j] != "`" and not text.startswith("${", j):
+                j += 2 if text[j] == "\\" else 1
+            if text.startswith("${", j):
+                out.append(text[i:j + 2])
+                depth += 1
+                stack.append(depth)
+                i = j + 2
+            else:
+                out.append(text[i:j + 1])
+                i = j + 1
+            last = "`"
+        elif text.startswith("//", i):
+            i = text.find("\n", i)
+            i = n if i < 0 else i
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            out.append(" ")
+        elif c == "/" and (last == "" or last in "(,=:[!&|?{};+-*%<>~^"):
+            j, in_class = i + 1, False
+            while j < n and (in_class or text[j] != "/") and text[j] != "\n":
+                if text[j] == "\\":
+                    j += 1
+                elif text[j] in "[]":
+                    in_class = text[j] == "["
+                j += 1
+            out.append(text[i:j + 1])
+            i, last = j + 1, "/"
+        else:
+            if c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+            if not c.isspace():
+                last = c
+            out.append(c)
+            i += 1
+    lines = (line.strip() for line in "".join(out).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+# -------- Build --------
+def _hashed(name: str, data: bytes) -> str:
+    stem, _, suffix = name.rpartition(".")
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{suffix}"
+
+
+def _write(out: Path, name: str, data: bytes) -> Dict[str, str]:
+    """Write ``name`` plus its precompressed variants; returns encoding -> file."""
+    path = out / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    files = {"identity": name}
+    # mtime=0 keeps the build reproducible
+    (out / f"{name}.gz").write_bytes(gzip.compress(data, 9, mtime=0))
+    files["gzip"] = f"{name}.gz"
+    if brotli is not None:
+        (out / f"{name}.br").write_bytes(brotli.compress(data, quality=11))
+        files["br"] = f"{name}.br"
+    return files
+
+
+def build(source: Path = ROOT, out: Path = DIST) -> Dict[str, Dict[str, str]]:
+    """Bundle ``source/index.html`` and what it references into ``out``."""
+    html = (source / "index.html").read_text(encoding="utf-8")
+
+    def fragment(match: re.Match) -> str:
+        path = source / "components" / f"{match.group(1)}.html"
+        return path.read_text(encoding="utf-8").strip() if path.exists() else match.group(0)
+
+    html = PLACEHOLDER.sub(fragment, html)
+
+    sheets = STYLESHEET.findall(html)
+    css = "\n".join((source / href).read_text(encoding="utf-8") for href in sheets)
+    # @import only counts at the top of a stylesheet
+    imports = CSS_IMPORT.findall(css)
+    css = "".join(imports) + minify_css(CSS_IMPORT.sub("", css))
+
+    scripts = SCRIPT.findall(html)
+    js = ";\n".join((source / src).read_text(encoding="utf-8") for src in scripts)
+    if API_BASE in js:
+        js = js.replace(API_BASE, "baseURL: ''")
+    js_bytes = minify_js(js).encode("utf-8")
+    js_name = "assets/" + _hashed("app.js", js_bytes)
+
+    html = HTML_COMMENT.sub("", html)
+    first = True
+
+    def stylesheet(_: re.Match) -> str:
+        nonlocal first
+        tag, first = (f"\n  <style>{css}</style>" if first else ""), False
+        return tag
+
+    html = STYLESHEET.sub(stylesheet, html)
+    first = True
+
+    def script(_: re.Match) -> str:
+        nonlocal first
+        tag, first = (f'\n  <script src="/{js_name}"></script>' if first else ""), False
+        return tag
+
+    html = SCRIPT.sub(script, html)
+    html = re.sub(r"\n\s*\n", "\n", html)
+
+    manifest = {
+        "index.html": _write(out, "index.html", html.encode("utf-8")),
+        js_name: _write(out, js_name, js_bytes),
+    }
+    # drop bundles left over from earlier builds
+    for old in (out / "assets").iterdir():
+        if old.name.split(".")[0] == "app" and not old.name.startswith(Path(js_name).name):
+            old.unlink()
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
+
+
+# -------- Serving --------
+class FrontendBundle:
+    """A built bundle held in memory, served with content negotiation.
+
+    ``index.html`` is revalidated on every load (ETag); hashed assets are
+    cached for a year, since a change gives them a new name.
+    """
+
+    def __init__(self, out: Path = DIST) -> None:
+        manifest = json.loads((out / MANIFEST).read_text(encoding="utf-8"))
+        # name -> encoding -> body
+        self.files: Dict[str, Dict[str, bytes]] = {
+            name: {enc: (out / file).read_bytes() for enc, file in variants.items()}
+            for name, variants in manifest.items()
+        }
+        self.etags = {
+            name: hashlib.sha256(v["identity"]).hexdigest()[:16] for name, v in self.files.items()
+        }
+
+    @classmethod
+    def load(cls, out: Path = DIST) -> Optional["FrontendBundle"]:
+        """The bundle in ``out``, or None when it has not been built."""
+        return cls(out) if (out / MANIFEST).exists() else None
+
+    def select(self, name: str, accept_encoding) -> Optional[Tuple[bytes, Optional[str]]]:
+        """(body, Content-Encoding) for the best variant the client accepts."""
+        variants = self.files.get(name)
+        if variants is None:
+            return None
+        for encoding in ("br", "gzip"):
+            if encoding in variants and accept_encoding[encoding]:
+                return variants[encoding], encoding
+        return variants["identity"], None
+
+    def cache_control(self, name: str) -> str:
+        return "no-cache" if name == "index.html" else IMMUTABLE
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the frontend bundle.")
+    parser.add_argument("--out", type=Path, default=DIST)
+    args = parser.parse_args()
+    for name, variants in build(ROOT, args.out).items():
+        sizes = ", ".join(
+            f"{enc} {(args.out / file).stat().st_size:,} B" for enc, file in variants.items()
+        )
+        print(f"{name}: {sizes}")
@@ -0,0 +1,289 @@
+from __future__ import annotations
+import re
+import threading
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+
+def guest_key(name: Optional[str], email: Optional[str], phone: Optional[str]) -> str:
+    """Identity of a guest: normalized email, else phone digits, else name."""
+    if email and email.strip():
+        return "email:" + email.strip().lower()
+    digits = re.sub(r"\D", "", phone or "")
+    if digits:
+        return "phone:" + digits
+    return "name:" + _normalize(name)
+
+
+def booking_ref(booking: Any) -> Hashable:
+    """Identity of a booking that survives it being rebuilt from a record.
+
+    The confirmation number when it has one; legacy bookings without one
+    fall back to the object itself.
+    """
+    return booking.confirmation_number or id(booking)
+
+
+# batches at least this big are indexed in one pass by add_many()/add_past()
+BULK_THRESHOLD = 64
+
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").split()).casefold()
+
+
+def _trigrams(term: str) -> Set[str]:
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class GuestRecord:
+    """One guest and the bookings currently on the books for them."""
+
+    __slots__ = ("key", "name", "email", "phone", "total_bookings", "bookings")
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.name = ""
+        self.email: Optional[str] = None
+        self.phone: Optional[str] = None
+        # bookings on the books plus checked-out stays in the archive
+        self.total_bookings = 0
+        # booking_ref -> (room number, booking) for active bookings
+        self.bookings: Dict[Hashable, Tuple[str, Any]] = {}
+
+    def terms(self) -> Set[str]:
+        """Normalized strings this guest can be found by."""
+        terms = {_normalize(self.name)}
+        if self.email:
+            terms.add(self.email.strip().lower())
+        digits = re.sub(r"\D", "", self.phone or "")
+        if digits:
+            terms.add(digits)
+        terms.discard("")
+        return terms
+
+    def to_dict(self) -> Dict[str, Any]:
+        bookings = sorted(self.bookings.values(), key=lambda item: item[1].check_in)
+        return {
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "totalBookings": self.total_bookings,
+            "bookings": [
+                {
+                    "roomNo": room_no,
+                    "checkIn": b.check_in,
+                    "checkOut": b.check_out,
+                    "confirmationNumber": b.confirmation_number,
+                    "checkedIn": b.checked_in,
+                    "checkedOut": b.checked_out,
+                }
+                for room_no, b in bookings
+            ],
+        }
+
+
+class GuestDirectory:
+    """Guests indexed for listing, prefix search and substring search.
+
+    Guests are keyed by :func:`guest_key`. Checked-out stays are counted
+    from the booking archive, so a guest stays listed after their bookings
+    end and the directory also serves as guest history. Prefix
+    queries bisect a sorted list of (term, key) pairs; substring queries
+    intersect trigram posting sets and then confirm the match.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._guests: Dict[str, GuestRecord] = {}
+        # booking_ref -> key, for every booking on the books
+        self._booking_keys: Dict[Hashable, str] = {}
+        self._terms: List[Tuple[str, str]] = []
+        self._grams: Dict[str, Set[str]] = {}
+        # (normalized name, key), the listing order
+        self._by_name: List[Tuple[str, str]] = []
+        # off while add_many() files a large batch; it rebuilds the indexes
+        self._indexing = True
+
+    def __len__(self) -> int:
+        return len(self._guests)
+
+    # -------- maintenance --------
+    def sync(self, room_no: str, before: Iterable[Hashable], after: Iterable[Any]) -> None:
+        """Re-file one room's bookings after a change.
+
+        ``before`` are the :func:`booking_ref` of the room's bookings prior
+        to the change and ``after`` the bookings it has now. A booking that
+        left the books stops counting; checked-out stays count again once
+        the archive reports them (see :meth:`add_past`).
+        """
+        with self._lock:
+            current = {booking_ref(b): b for b in after}
+            for booking_id in before:
+                if booking_id not in current:
+                    self._detach(booking_id)
+            for booking_id, booking in current.items():
+                key = guest_key(booking.guest_name, booking.guest_email, booking.guest_phone)
+                old_key = self._booking_keys.get(booking_id)
+                if old_key is not None and old_key != key:
+                    # contact details changed: the booking belongs elsewhere now
+                    self._detach(booking_id)
+                    old_key = None
+                guest = self._guest(key)
+                if old_key is None:
+                    guest.total_bookings += 1
+                    self._booking_keys[booking_id] = key
+                guest.bookings[booking_id] = (room_no, booking)
+                self._file_details(guest, booking.guest_name, booking.guest_email, booking.guest_phone)
+
+    def add_many(self, rooms: Iterable[Tuple[str, Iterable[Any]]]) -> None:
+        """File the bookings of many rooms not seen before, e.g. at startup."""
+        rooms = list(rooms)
+
+        def file_all() -> None:
+            for room_no, bookings in rooms:
+                self.sync(room_no, (), bookings)
+
+        self._bulk(len(rooms), file_all)
+
+    def add_past(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Count completed stays (booking archive records) towards their guests."""
+        records = iter(records)
+        # streamed: the archive can hold far more stays than fit as a list
+        head = list(islice(records, BULK_THRESHOLD))
+
+        def file_all() -> None:
+            for record in chain(head, records):
+                self._file_past(record)
+
+        self._bulk(len(head), file_all)
+
+    def _bulk(self, size: int, work: Callable[[], None]) -> None:
+        # Large batches skip the per-guest index upkeep and re-sort the
+        # search indexes once at the end.
+        with self._lock:
+            if size < BULK_THRESHOLD:
+                work()
+                return
+            self._indexing = False
+            try:
+                work()
+            finally:
+                self._indexing = True
+            self._terms = sorted(
+                (term, key) for key, guest in self._guests.items() for term in guest.terms()
+            )
+            self._grams = {}
+            for term, key in self._terms:
+                for gram in _trigrams(term):
+                    self._grams.setdefault(gram, set()).add(key)
+            self._by_name = sorted(
+                (_normalize(guest.name), key) for key, guest in self._guests.items()
+            )
+
+    def _file_past(self, record: Dict[str, Any]) -> None:
+        name = record.get("guestName") or ""
+        email, phone = record.get("guestEmail"), record.get("guestPhone")
+        guest = self._guest(guest_key(name, email, phone))
+        guest.total_bookings += 1
+        self._file_details(guest, name, email, phone)
+
+    def _guest(self, key: str) -> GuestRecord:
+        guest = self._guests.get(key)
+        if guest is None:
+            guest = self._guests[key] = GuestRecord(key)
+        return guest
+
+    def _detach(self, booking_id: Hashable) -> None:
+        key = self._booking_keys.pop(booking_id, None)
+        guest = self._guests.get(key) if key else None
+        if guest is None:
+            return
+        guest.bookings.pop(booking_id, None)
+        guest.total_bookings -= 1
+        if guest.total_bookings <= 0:
+            self._unindex_terms(key, guest.terms())
+            if guest.name:
+                self._by_name.remove((_normalize(guest.name), key))
+            del self._guests[key]
+
+    def _file_details(
+        self, guest: GuestRecord, name: str, email: Optional[str], phone: Optional[str]
+    ) -> None:
+        if not self._indexing:
+            self._refresh_details(guest, name, email, phone)
+            return
+        old_terms = guest.terms()
+        self._refresh_details(guest, name, email, phone)
+        new_terms = guest.terms()
+        if new_terms != old_terms:
+            self._unindex_terms(guest.key, old_terms - new_terms)
+            self._index_terms(guest.key, new_terms - old_terms)
+
+    def _refresh_details(
+        self, guest: GuestRecord, name: str, email: Optional[str], phone: Optional[str]
+    ) -> None:
+        if guest.name != name:
+            if self._indexing:
+                if guest.name:
+                    self._by_name.remove((_normalize(guest.name), guest.key))
+                insort(self._by_name, (_normalize(name), guest.key))
+            guest.name = name
+        guest.email = email or guest.email
+        guest.phone = phone or guest.phone
+
+    def _index_terms(self, key: str, terms: Set[str]) -> None:
+        for term in terms:
+            insort(self._terms, (term, key))
+            for gram in _trigrams(term):
+                self._grams.setdefault(gram, set()).add(key)
+
+    def _unindex_terms(self, key: str, terms: Set[str]) -> None:
+        for term in terms:
+            i = bisect_left(self._terms, (term, key))
+            if i < len(self._terms) and self._terms[i] == (term, key):
+                del self._terms[i]
+        remaining = set().union(*(_trigrams(t) for t in self._guests[key].terms() - terms))
+        for gram in set().union(*(_trigrams(t) for t in terms)) - remaining:
+            keys = self._grams.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    # -------- queries --------
+    def list(self, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[GuestRecord], int]:
+        with self._lock:
+            end = None if limit is None else offset + limit
+            page = [self._guests[key] for _, key in self._by_name[offset:end]]
+            return page, len(self._by_name)
+
+    def search(
+        self, query: str, prefix: bool = False, offset: int = 0, limit: Optional[int] = 50
+    ) -> Tuple[List[GuestRecord], int]:
+        """Guests whose name, email or phone starts with / contains ``query``.
+
+        Queries shorter than three characters always match by prefix.
+        Results are ordered by name.
+        """
+        q = _normalize(query)
+        if not q:
+            return [], 0
+        with self._lock:
+            if prefix or len(q) < 3:
+                lo = bisect_left(self._terms, (q,))
+                hi = bisect_left(self._terms, (q + "\U0010ffff",))
+                keys = {key for _, key in self._terms[lo:hi]}
+            else:
+                postings = sorted((self._grams.get(g, set()) for g in _trigrams(q)), key=len)
+                candidates = set(postings[0]).intersection(*postings[1:])
+                keys = {
+                    key for key in candidates
+                    if any(q in term for term in self._guests[key].terms())
+                }
+            matches = sorted(
+                (self._guests[key] for key in keys), key=lambda g: (_normalize(g.name), g.key)
+            )
+        end = None if limit is None else offset + limit
+        return matches[offset:end], len(matches)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+import cProfile
+import io
+import pstats
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# seconds; spans a cached GET (~0.1 ms) up to a full JSON dump of a big hotel
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+COUNT_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = _labels(self.labels, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+class Gauge:
+    """A value read from ``read()`` whenever metrics are rendered."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float]) -> None:
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_number(self.read())}"]
+
+
+class Registry:
+    """Named metrics rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: List = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._add(Gauge(name, help, read))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class RouteProfiler:
+    """Runs a sample of requests under cProfile and keeps stats per route.
+
+    One sampled request profiles at a time (cProfile cannot nest), so a
+    request that would overlap simply runs unprofiled.
+    """
+
+    def __init__(self, every: int) -> None:
+        # profile one request in ``every``
+        self.every = max(1, every)
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._seen = 0
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._samples: Dict[str, int] = {}
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """A running profiler if this request is sampled, else None."""
+        with self._lock:
+            self._seen += 1
+            if self._seen % self.every:
+                return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def stop(self, profiler: cProfile.Profile, route: str) -> None:
+        profiler.disable()
+        self._busy.release()
+        with self._lock:
+            if route in self._stats:
+                self._stats[route].add(profiler)
+            else:
+                self._stats[route] = pstats.Stats(profiler)
+            self._samples[route] = self._samples.get(route, 0) + 1
+
+    def report(self, top: int = 20, route: Optional[str] = None) -> str:
+        """The ``top`` functions by cumulative time for each (or one) route."""
+        out = io.StringIO()
+        with self._lock:
+            for name in sorted(self._stats):
+                if route is not None and name != route:
+                    continue
+                out.write(f"=== {name} ({self._samples[name]} sampled requests)\n")
+                stats = pstats.Stats(stream=out)
+                stats.add(self._stats[name])
+                stats.sort_stats("cumulative").print_stats(top)
+        return out.getvalue() or "no sampled requests yet\n"
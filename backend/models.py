@@ -1,10 +1,30 @@
 from __future__ import annotations
+import math
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from datetime import date
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Callable, FrozenSet, Iterable, Iterator, Set, Tuple
+
+from guests import GuestDirectory, booking_ref
+
+
+# values of AbstractRoom.status
+ROOM_STATUSES = ("available", "maintenance", "cleaning")
+
+# amenity lists -> one shared tuple per distinct list, since most rooms
+# have one of a handful of amenity sets; bounded, as clients pick the lists
+_AMENITY_SETS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+AMENITY_SETS_MAX = 1024
 
 
 class AbstractRoom:
-   
+    # slots instead of a per-room __dict__; subclasses add none
+    __slots__ = ("number", "price", "is_booked", "booked_by", "status", "_amenities", "notes")
+
     def __init__(self, number: str, price: float) -> None:
         if self.__class__ is AbstractRoom:
             raise TypeError("Cannot instantiate AbstractRoom directly")
@@ -13,9 +33,25 @@ class AbstractRoom:
         self.is_booked: bool = False
         self.booked_by: Optional[str] = None
         self.status: str = "available"  # available, maintenance, cleaning
-        self.amenities: List[str] = []
+        self.amenities = ()
         self.notes: Optional[str] = None
 
+    @property
+    def amenities(self) -> Tuple[str, ...]:
+        return self._amenities
+
+    @amenities.setter
+    def amenities(self, value: Iterable[str]) -> None:
+        value = tuple(value)
+        if not all(isinstance(a, str) for a in value):
+            # older data may hold anything here; keep it, just unshared
+            self._amenities = value
+            return
+        shared = _AMENITY_SETS.get(value)
+        if shared is None:
+            shared = _AMENITY_SETS.setdefault(value, value) if len(_AMENITY_SETS) < AMENITY_SETS_MAX else value
+        self._amenities = shared
+
     def get_description(self) -> str:
         raise NotImplementedError
 
@@ -31,27 +67,33 @@ class AbstractRoom:
             "bookedBy": self.booked_by,
             "type": self.type,
             "status": self.status,
-            "amenities": self.amenities,
+            "amenities": list(self.amenities),
             "notes": self.notes,
         }
 
 
 class SingleRoom(AbstractRoom):
+    __slots__ = ()
+
     def get_description(self) -> str:
         return f"Single Room — ₹{self.price}"
 
 
 class DoubleRoom(AbstractRoom):
+    __slots__ = ()
+
     def get_description(self) -> str:
         return f"Double Room — ₹{self.price}"
 
 
 class SuiteRoom(AbstractRoom):
+    __slots__ = ()
+
     def get_description(self) -> str:
         return f"Luxury Suite — ₹{self.price}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Booking:
     guest_name: str
     check_in: str  # ISO date string (YYYY-MM-DD)
@@ -65,6 +107,17 @@ class Booking:
     checked_out: bool = False
     check_in_time: Optional[str] = None
     check_out_time: Optional[str] = None
+    # check_in / check_out parsed when assigned (None if malformed)
+    check_in_date: Optional[date] = field(init=False, repr=False, compare=False)
+    check_out_date: Optional[date] = field(init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "check_in" or name == "check_out":
+            if isinstance(value, str):
+                # a date string per booking adds up; share equal ones
+                value = sys.intern(value)
+            object.__setattr__(self, name + "_date", _parse_date(value))
+        object.__setattr__(self, name, value)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -82,58 +135,856 @@ class Booking:
             "checkOutTime": self.check_out_time,
         }
 
+    def span(self) -> Tuple[date, date]:
+        """(check-in, check-out) as dates; see :func:`parse_stay`."""
+        start, end = self.check_in_date, self.check_out_date
+        if start is None or end is None:
+            raise ValueError("checkIn and checkOut must be dates (YYYY-MM-DD)")
+        if end <= start:
+            raise ValueError("checkOut must be after checkIn")
+        return start, end
+
+    @property
+    def nights(self) -> int:
+        """Length of stay; 0 when either date is missing or malformed."""
+        try:
+            start, end = self.span()
+        except ValueError:
+            return 0
+        return (end - start).days
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    return _parse_iso(value) if isinstance(value, str) else None
+
+
+@lru_cache(maxsize=8192)
+def _parse_iso(value: str) -> Optional[date]:
+    # cached: bookings share few distinct dates, and share the date objects
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_stay(check_in: Any, check_out: Any) -> Tuple[date, date]:
+    """Parse ISO check-in/check-out dates, requiring check-out after check-in."""
+    try:
+        start = date.fromisoformat(check_in)
+        end = date.fromisoformat(check_out)
+    except (TypeError, ValueError):
+        raise ValueError("checkIn and checkOut must be dates (YYYY-MM-DD)") from None
+    if end <= start:
+        raise ValueError("checkOut must be after checkIn")
+    return start, end
+
+
+class RoomCalendar:
+    """Bookings of one room ordered by check-in, for O(log n) overlap checks.
+
+    Stays are half-open ``[check_in, check_out)`` so a guest can check in on
+    the day the previous one checks out. Bookings never overlap, which
+    means ordering by check-in also orders them by check-out.
+    """
+
+    def __init__(self) -> None:
+        self._starts: List[date] = []
+        self._ends: List[date] = []
+        self._bookings: List[Booking] = []
+
+    def __len__(self) -> int:
+        return len(self._bookings)
+
+    def __iter__(self) -> Iterator[Booking]:
+        return iter(list(self._bookings))
+
+    def first(self) -> Optional[Booking]:
+        return self._bookings[0] if self._bookings else None
+
+    def conflict(
+        self, start: date, end: date, ignore: Optional[Booking] = None
+    ) -> Optional[Booking]:
+        """The booking overlapping ``[start, end)``, if any."""
+        i = bisect_left(self._starts, end)
+        # Only the latest stay starting before ``end`` can reach past
+        # ``start``; step over ``ignore`` when re-checking a booking's move.
+        while i > 0:
+            i -= 1
+            if self._bookings[i] is ignore:
+                continue
+            return self._bookings[i] if self._ends[i] > start else None
+        return None
+
+    def add(self, booking: Booking) -> None:
+        try:
+            start, end = booking.span()
+        except ValueError:
+            # legacy rows with unusable dates: keep them, but as empty stays
+            start = end = date.min
+        i = bisect_right(self._starts, start)
+        self._starts.insert(i, start)
+        self._ends.insert(i, end)
+        self._bookings.insert(i, booking)
+
+    def remove(self, booking: Booking) -> None:
+        i = next(i for i, b in enumerate(self._bookings) if b is booking)
+        del self._starts[i], self._ends[i], self._bookings[i]
+
+    def find(self, confirmation: str) -> Optional[Booking]:
+        return next(
+            (b for b in self._bookings if b.confirmation_number == confirmation), None
+        )
+
 
 class Hotel:
     """Aggregate root coordinating rooms and bookings."""
 
     def __init__(self) -> None:
-        self.rooms: List[AbstractRoom] = []
-        # store bookings as mapping roomNo -> Booking
+        self._room_list: List[AbstractRoom] = []
+        # number -> room index so lookups don't scan the room list
+        self._rooms_by_number: Dict[str, AbstractRoom] = {}
+        # every booking of a room, current and future, ordered by date
+        self._calendars: Dict[str, RoomCalendar] = {}
+        # roomNo -> current booking, i.e. the earliest one in the calendar
         self._bookings: Dict[str, Booking] = {}
+        # room numbers touched since the repository last drained them
+        # (insertion-ordered set; values are unused)
+        self._dirty: Dict[str, None] = {}
+        self._dirty_lock = threading.Lock()
+        # bumped by every mutation; readers use it to validate caches
+        self._version = 0
+        # room number -> version of its last change, for per-room caches
+        self._room_versions: Dict[str, int] = {}
+        # Writers lock the room they change; adding/removing rooms also
+        # takes the structural lock. Readers take no lock at all and work
+        # on list/dict copies, so polling never stalls a booking.
+        self._lock = threading.RLock()
+        # room number -> [lock, threads holding or waiting for it]; kept
+        # while the room exists or someone uses the lock (see room_lock)
+        self._room_locks: Dict[str, List[Any]] = {}
+        self._room_locks_lock = threading.Lock()
+        # Running totals behind get_stats(), adjusted by _changing().
+        self._stats_lock = threading.Lock()
+        self._available_count = 0
+        self._booked_count = 0
+        self._revenue = 0.0
+        # Secondary indexes behind query_rooms(), also kept by _changing():
+        # tag ("type:SuiteRoom", "status:booked", "amenity:wifi") -> numbers,
+        # (price, number) pairs in price order, and number -> insertion seq.
+        self._tags: Dict[str, Set[str]] = {}
+        self._room_tags: Dict[str, FrozenSet[str]] = {}
+        self._prices: List[Tuple[float, str]] = []
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        # check-out date of each room's current booking -> room numbers,
+        # so "due today/tomorrow" is a bucket lookup
+        self._checkouts: Dict[date, Set[str]] = {}
+        # confirmation number -> (room number, booking) for every booking
+        # on the books; completed ones are looked up in the archive
+        self._confirmations: Dict[str, Tuple[str, Booking]] = {}
+        # guests of every booking and archived stay, searchable
+        self._guests = GuestDirectory()
+        # Lazy mode (see defer()): rooms known by number but not loaded
+        # yet, and the callable that loads them. _load_lock serializes
+        # loading so a room is never loaded twice.
+        self._pending: Dict[str, bool] = {}
+        self._loader: Optional[Callable[[List[str]], List[Tuple[AbstractRoom, List[Booking]]]]] = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def rooms(self) -> List[AbstractRoom]:
+        """Every room, in insertion order."""
+        self._load_all()
+        return self._room_list
+
+    @property
+    def guests(self) -> GuestDirectory:
+        self._load_all()
+        return self._guests
+
+    def add_guest_history(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Count checked-out stays (booking archive records) in the guest directory.
+
+        Does not load deferred rooms: their bookings are filed when they load.
+        """
+        self._guests.add_past(records)
+
+    # -------- Concurrency --------
+    @contextmanager
+    def room_lock(self, room_no: str) -> Iterator[None]:
+        """Hold the lock guarding one room and its booking (re-entrant).
+
+        Works for numbers with no room too (adding one, or a lookup that
+        will fail), but their lock is dropped once nobody holds or waits
+        for it, so unknown and deleted numbers don't pile up.
+        """
+        with self._room_locks_lock:
+            entry = self._room_locks.get(room_no)
+            if entry is None:
+                entry = self._room_locks[room_no] = [threading.RLock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._room_locks_lock:
+                entry[1] -= 1
+                if not entry[1] and room_no not in self._rooms_by_number:
+                    del self._room_locks[room_no]
+
+    # -------- Change tracking --------
+    @contextmanager
+    def _changing(self, room_no: str) -> Iterator[None]:
+        """Wrap every mutation of one room.
+
+        Holds the room lock, backs the room's old contribution out of the
+        running statistics, and adds the new one back once the body is
+        done. If the body completed and the room exists (or did before),
+        it is then marked dirty for the repository and the version moves
+        on; a rejected change leaves both alone.
+        """
+        if self._pending:
+            self._materialize(room_no)
+        with self.room_lock(room_no):
+            existed = room_no in self._rooms_by_number
+            before = self._contribution(room_no)
+            old_price = self._price_of(room_no)
+            old_checkout = self._checkout_of(room_no)
+            old_bookings = [booking_ref(b) for b in self._calendars.get(room_no, ())]
+            old_confirmations = [b.confirmation_number for b in self._calendars.get(room_no, ())]
+            completed = False
+            try:
+                yield
+                completed = True
+            finally:
+                # the indexes are diffed, so this is a no-op when a failed
+                # body changed nothing, and repairs them when it got partway
+                self._rebucket(room_no, old_checkout)
+                self._guests.sync(room_no, old_bookings, self._calendars.get(room_no, ()))
+                self._reconfirm(room_no, old_confirmations)
+                after = self._contribution(room_no)
+                with self._stats_lock:
+                    self._available_count += after[0] - before[0]
+                    self._booked_count += after[1] - before[1]
+                    self._revenue += after[2] - before[2]
+                self._reindex(room_no, old_price)
+                if completed and (existed or room_no in self._rooms_by_number):
+                    self._touch(room_no)
+
+    def _contribution(self, room_no: str) -> Tuple[int, int, float]:
+        room = self._rooms_by_number.get(room_no)
+        if room is None:
+            return 0, 0, 0.0
+        booking = self._bookings.get(room_no)
+        return (
+            int(not room.is_booked and room.status == "available"),
+            int(room.is_booked),
+            room.price * booking.nights if booking is not None else 0.0,
+        )
+
+    def _reconfirm(self, room_no: str, old: List[Optional[str]]) -> None:
+        with self._lock:
+            for number in old:
+                entry = self._confirmations.get(number)
+                if entry is not None and entry[0] == room_no:
+                    del self._confirmations[number]
+            if room_no not in self._rooms_by_number:
+                return
+            for booking in self._calendars.get(room_no, ()):
+                if booking.confirmation_number:
+                    self._confirmations[booking.confirmation_number] = (room_no, booking)
+
+    def _checkout_of(self, room_no: str) -> Optional[date]:
+        booking = self._bookings.get(room_no)
+        return booking.check_out_date if booking is not None else None
+
+    def _rebucket(self, room_no: str, old_checkout: Optional[date]) -> None:
+        new_checkout = self._checkout_of(room_no)
+        if new_checkout == old_checkout:
+            return
+        with self._lock:
+            if old_checkout is not None:
+                bucket = self._checkouts[old_checkout]
+                bucket.discard(room_no)
+                if not bucket:
+                    del self._checkouts[old_checkout]
+            if new_checkout is not None:
+                self._checkouts.setdefault(new_checkout, set()).add(room_no)
+
+    def checkouts_on(self, day: date) -> List[Tuple[str, Booking]]:
+        """Current bookings checking out on ``day``, in room order."""
+        self._load_all()
+        with self._lock:
+            numbers = sorted(self._checkouts.get(day, ()), key=lambda no: self._seq.get(no, -1))
+        return [
+            (no, booking)
+            for no in numbers
+            if (booking := self._bookings.get(no)) is not None
+        ]
+
+    def _price_of(self, room_no: str) -> Optional[float]:
+        room = self._rooms_by_number.get(room_no)
+        return room.price if room is not None else None
+
+    @staticmethod
+    def _tags_of(room: AbstractRoom) -> FrozenSet[str]:
+        # "available" keeps its /rooms?status= meaning: free and not booked
+        status = "booked" if room.is_booked and room.status == "available" else room.status
+        return frozenset(
+            [f"type:{room.type}", f"status:{status}"]
+            + (["status:booked"] if room.is_booked else [])
+            + [f"amenity:{a}" for a in room.amenities]
+        )
+
+    def _reindex(self, room_no: str, old_price: Optional[float]) -> None:
+        room = self._rooms_by_number.get(room_no)
+        new_tags = self._tags_of(room) if room is not None else frozenset()
+        old_tags = self._room_tags.get(room_no, frozenset())
+        with self._lock:
+            for tag in old_tags - new_tags:
+                numbers = self._tags[tag]
+                numbers.discard(room_no)
+                if not numbers:
+                    del self._tags[tag]
+            for tag in new_tags - old_tags:
+                self._tags.setdefault(tag, set()).add(room_no)
+            if new_tags:
+                self._room_tags[room_no] = new_tags
+            else:
+                self._room_tags.pop(room_no, None)
+            new_price = room.price if room is not None else None
+            if new_price != old_price:
+                if old_price is not None:
+                    i = bisect_left(self._prices, (old_price, room_no))
+                    del self._prices[i]
+                if new_price is not None:
+                    self._prices.insert(bisect_left(self._prices, (new_price, room_no)), (new_price, room_no))
+
+    def _touch(self, room_no: str) -> None:
+        with self._dirty_lock:
+            self._dirty[room_no] = None
+            self._version += 1
+            if room_no in self._rooms_by_number:
+                self._room_versions[room_no] = self._version
+            else:
+                self._room_versions.pop(room_no, None)
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter, incremented by every change to any room."""
+        return self._version
+
+    def room_version(self, room_no: str) -> int:
+        """Hotel version at which this room (or its bookings) last changed."""
+        return self._room_versions.get(room_no, 0)
+
+    def drain_changes(self) -> List[str]:
+        """Return the room numbers changed since the last drain and reset."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+        return list(dirty)
+
+    def room_record(self, room_no: str) -> Dict[str, Any]:
+        """Current state of one room and its booking, as a journal record."""
+        with self.room_lock(room_no):
+            room = self.get_room(room_no)
+            if room is None:
+                return {"op": "delete", "number": room_no}
+            booking = self._bookings.get(room_no)
+            return {
+                "op": "put",
+                "number": room_no,
+                "room": room.to_dict(),
+                "booking": booking.to_dict() if booking else None,
+                "reservations": [
+                    b.to_dict() for b in self._reservations(room_no)
+                ],
+            }
+
+    def apply_record(self, record: Dict[str, Any]) -> None:
+        """Overwrite one room with the state captured by :meth:`room_record`.
+
+        Records are absolute, so applying the same record twice is harmless.
+        """
+        room_no = str(record["number"])
+        with self._changing(room_no):
+            current = self.get_room(room_no)
+            self._bookings.pop(room_no, None)
+            self._calendars.pop(room_no, None)
+            if record["op"] == "delete":
+                if current is not None:
+                    self._drop_room(current)
+                return
+            room = Hotel.room_from_dict(record["room"])
+            if current is None:
+                self._insert_room(room)
+            else:
+                self._swap_room(current, room)
+            stays = [record.get("booking")] + record.get("reservations", [])
+            for data in filter(None, stays):
+                self._calendar(room_no).add(Hotel.booking_from_dict(data))
+            if self._calendars.get(room_no):
+                self._sync_current(room_no)
+
+    def restore_booking(self, room_no: str, booking: Booking) -> None:
+        """Attach a persisted booking without the availability checks."""
+        with self._changing(room_no):
+            self._calendar(room_no).add(booking)
+            self._sync_current(room_no)
+
+    # -------- Transactions --------
+    @contextmanager
+    def transaction(self, room_numbers: Iterable[str]) -> Iterator[None]:
+        """Change several rooms all or nothing.
+
+        Locks the given rooms (in sorted order, so concurrent transactions
+        cannot deadlock) and records their state. If the body raises, every
+        one of them that differs is put back as it was before the exception
+        propagates; rooms the body left alone are not touched, so a batch
+        that fails before changing anything leaves the version as it was.
+        Changes to rooms not listed are not rolled back.
+        """
+        numbers = sorted(set(room_numbers))
+        with ExitStack() as stack:
+            for room_no in numbers:
+                stack.enter_context(self.room_lock(room_no))
+            saved = [self.room_record(room_no) for room_no in numbers]
+            try:
+                yield
+            except BaseException:
+                for record in saved:
+                    if self.room_record(record["number"]) != record:
+                        self.apply_record(record)
+                raise
+
+    # -------- Loading --------
+    def load_rooms(self, rooms: Iterable[Tuple[AbstractRoom, Iterable[Booking]]]) -> None:
+        """Add rooms with their bookings in one pass, e.g. at startup.
+
+        Unlike add_room()/restore_booking() per item, the indexes are built
+        once for the whole batch (sorting instead of inserting one entry at
+        a time), so loading is O(n log n). Nothing is marked changed: the
+        rooms are assumed to be on disk already.
+        """
+        loaded = []
+        with self._lock:
+            for room, bookings in rooms:
+                if room.number in self._rooms_by_number:
+                    raise ValueError("Room already exists")
+                self._insert_room(room)
+                for booking in bookings:
+                    self._calendar(room.number).add(booking)
+                self._sync_current(room.number)
+                loaded.append(room)
+
+            available = booked = 0
+            revenue = 0.0
+            prices = []
+            for room in loaded:
+                room_no = room.number
+                contribution = self._contribution(room_no)
+                available += contribution[0]
+                booked += contribution[1]
+                revenue += contribution[2]
+                tags = self._room_tags[room_no] = self._tags_of(room)
+                for tag in tags:
+                    self._tags.setdefault(tag, set()).add(room_no)
+                prices.append((room.price, room_no))
+                checkout = self._checkout_of(room_no)
+                if checkout is not None:
+                    self._checkouts.setdefault(checkout, set()).add(room_no)
+                for booking in self._calendars.get(room_no, ()):
+                    if booking.confirmation_number:
+                        self._confirmations[booking.confirmation_number] = (room_no, booking)
+            if len(prices) < 64:
+                for entry in prices:
+                    self._prices.insert(bisect_left(self._prices, entry), entry)
+            else:
+                self._prices = sorted(self._prices + prices)
+            with self._stats_lock:
+                self._available_count += available
+                self._booked_count += booked
+                self._revenue += revenue
+        self._guests.add_many(
+            (room.number, list(self._calendars.get(room.number, ()))) for room in loaded
+        )
+
+    def defer(
+        self,
+        numbers: Iterable[str],
+        loader: Callable[[List[str]], List[Tuple[AbstractRoom, List[Booking]]]],
+    ) -> None:
+        """Lazy mode: declare rooms that ``loader`` loads on first use.
+
+        ``loader(numbers)`` returns ``(room, bookings)`` for each number it
+        finds. A room is loaded when it is looked up or changed; anything
+        that spans the whole hotel (listing, stats, search) loads all
+        remaining rooms in one batch first. The loader is called without
+        any hotel lock held.
+        """
+        with self._lock:
+            for number in numbers:
+                if number in self._rooms_by_number or number in self._pending:
+                    continue
+                self._pending[number] = True
+                self._seq[number] = self._next_seq
+                self._next_seq += 1
+            self._loader = loader
+
+    def _materialize(self, room_no: str) -> None:
+        if room_no not in self._pending:
+            return
+        loaded = self._loader([room_no])
+        with self._load_lock:
+            if self._pending.pop(room_no, False):
+                self.load_rooms(loaded)
+
+    def _load_all(self) -> None:
+        if not self._pending:
+            return
+        with self._load_lock:
+            numbers = list(self._pending)
+            if not numbers:
+                return
+            loaded = self._loader(numbers)
+            for number in numbers:
+                del self._pending[number]
+            self.load_rooms(loaded)
+            with self._lock:
+                self._room_list.sort(key=lambda r: self._seq[r.number])
 
     # -------- Room management --------
     def add_room(self, room: AbstractRoom) -> None:
-        if any(r.number == room.number for r in self.rooms):
-            raise ValueError("Room already exists")
-        self.rooms.append(room)
+        with self._changing(room.number):
+            self._insert_room(room)
 
     def get_room(self, room_no: str) -> Optional[AbstractRoom]:
-        return next((r for r in self.rooms if r.number == room_no), None)
+        room = self._rooms_by_number.get(room_no)
+        if room is None and room_no in self._pending:
+            self._materialize(room_no)
+            room = self._rooms_by_number.get(room_no)
+        return room
+
+    def _require_room(self, room_no: str) -> AbstractRoom:
+        room = self.get_room(room_no)
+        if room is None:
+            raise LookupError("Room not found")
+        return room
+
+    def replace_room(self, old: AbstractRoom, new: AbstractRoom) -> None:
+        """Swap ``old`` for ``new`` in place, keeping list order and the index."""
+        if old.number != new.number:
+            raise ValueError("Replacement room must keep the same number")
+        with self._changing(new.number):
+            self._swap_room(old, new)
+
+    def remove_room(self, room: AbstractRoom) -> None:
+        with self._changing(room.number):
+            self._drop_room(room)
+
+    # Raw structural edits; callers hold _changing() for the room.
+    def _insert_room(self, room: AbstractRoom) -> None:
+        with self._lock:
+            if room.number in self._rooms_by_number:
+                raise ValueError("Room already exists")
+            self._room_list.append(room)
+            self._rooms_by_number[room.number] = room
+            if room.number not in self._seq:  # deferred rooms have theirs
+                self._seq[room.number] = self._next_seq
+                self._next_seq += 1
+
+    def _swap_room(self, old: AbstractRoom, new: AbstractRoom) -> None:
+        with self._lock:
+            index = self._room_list.index(old)
+            self._room_list[index] = new
+            self._rooms_by_number[new.number] = new
+
+    def _drop_room(self, room: AbstractRoom) -> None:
+        with self._lock:
+            self._room_list.remove(room)
+            del self._rooms_by_number[room.number]
+            del self._seq[room.number]
+
+    def set_room_price(self, room_no: str, price: float) -> None:
+        with self._changing(room_no):
+            self._require_room(room_no).price = price
+
+    def set_room_status(
+        self, room_no: str, status: Optional[str] = None, notes: Optional[str] = None
+    ) -> None:
+        with self._changing(room_no):
+            room = self._require_room(room_no)
+            if status is not None:
+                room.status = status
+            if notes is not None:
+                room.notes = notes
+
+    def set_room_amenities(self, room_no: str, amenities: List[str]) -> None:
+        with self._changing(room_no):
+            self._require_room(room_no).amenities = amenities
+
+    def query_rooms(
+        self,
+        room_type: Optional[str] = None,
+        status: Optional[str] = None,
+        amenities: Optional[List[str]] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        cursor: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[AbstractRoom], int, Optional[int]]:
+        """Filter and page rooms through the secondary indexes.
+
+        ``status`` is "available", "booked", "maintenance" or "cleaning".
+        Rooms come back in insertion order; ``cursor`` is the value returned
+        as the third element of the previous page. Returns
+        ``(page, total_matches, next_cursor)``.
+        """
+        self._load_all()
+        tags = [f"type:{room_type}"] if room_type else []
+        tags += [f"status:{status}"] if status else []
+        tags += [f"amenity:{a}" for a in amenities or ()]
+        with self._lock:
+            candidates: Optional[Set[str]] = None
+            for tag in sorted(tags, key=lambda t: len(self._tags.get(t, ()))):
+                numbers = self._tags.get(tag, set())
+                candidates = set(numbers) if candidates is None else candidates & numbers
+            if min_price is not None or max_price is not None:
+                lo = bisect_left(self._prices, (min_price,)) if min_price is not None else 0
+                hi = (
+                    bisect_right(self._prices, (max_price, "\U0010ffff"))
+                    if max_price is not None
+                    else len(self._prices)
+                )
+                in_range = {no for _, no in self._prices[lo:hi]}
+                candidates = in_range if candidates is None else candidates & in_range
+            seq = self._seq
+            if candidates is None:
+                ordered = list(self._room_list)
+                start = 0 if cursor is None else bisect_right(
+                    ordered, cursor, key=lambda r: seq[r.number]
+                )
+            else:
+                numbers = sorted(candidates, key=seq.__getitem__)
+                ordered = [self._rooms_by_number[no] for no in numbers]
+                start = 0 if cursor is None else bisect_right(numbers, cursor, key=seq.__getitem__)
+        end = len(ordered) if limit is None else start + limit
+        page = ordered[start:end]
+        next_cursor = seq.get(page[-1].number) if page and end < len(ordered) else None
+        return page, len(ordered), next_cursor
 
     def get_available_rooms(self) -> List[AbstractRoom]:
-        return [r for r in self.rooms if not r.is_booked and r.status == "available"]
+        return [r for r in list(self.rooms) if not r.is_booked and r.status == "available"]
 
     def get_booked_rooms(self) -> List[AbstractRoom]:
-        return [r for r in self.rooms if r.is_booked]
+        return [r for r in list(self.rooms) if r.is_booked]
 
     # -------- Booking management --------
-    def book_room(self, room_no: str, booking: Booking) -> None:
+    def _calendar(self, room_no: str) -> RoomCalendar:
+        calendar = self._calendars.get(room_no)
+        if calendar is None:
+            calendar = self._calendars[room_no] = RoomCalendar()
+        return calendar
+
+    def _reservations(self, room_no: str) -> List[Booking]:
+        """Bookings of a room after the current one."""
+        return list(self._calendars.get(room_no, ()))[1:]
+
+    def _sync_current(self, room_no: str) -> None:
+        """Point the room (and ``_bookings``) at the earliest booking left."""
+        calendar = self._calendars.get(room_no)
+        head = calendar.first() if calendar else None
+        if calendar is not None and head is None:
+            del self._calendars[room_no]
         room = self.get_room(room_no)
-        if room is None:
-            raise LookupError("Room not found")
-        if room.is_booked:
-            raise ValueError("Room already booked")
-        if room.status != "available":
-            raise ValueError(f"Room is not available for booking (status: {room.status})")
-        room.is_booked = True
-        room.booked_by = booking.guest_name
-        self._bookings[room_no] = booking
+        if room is not None:
+            room.is_booked = head is not None
+            room.booked_by = head.guest_name if head else None
+        if head is None:
+            self._bookings.pop(room_no, None)
+        else:
+            self._bookings[room_no] = head
+
+    def _keep_in_house(self, room_no: str, start: date, booking: Optional[Booking] = None) -> None:
+        """Refuse a stay from ``start`` that would displace a checked-in guest.
+
+        ``booking`` is the booking being moved, if any. A checked-in current
+        booking must stay current: nothing may be put before it, and it may
+        not itself be moved past the next reservation.
+        """
+        current = self._bookings.get(room_no)
+        if current is None or not current.checked_in:
+            return
+        if booking is current:
+            following = self._reservations(room_no)
+            if following and following[0].check_in_date is not None and following[0].check_in_date < start:
+                raise ValueError("A checked-in stay cannot move past the next reservation")
+        elif current.check_in_date is None or start < current.check_in_date:
+            raise ValueError(f"Room is occupied by a checked-in guest ({current.guest_name})")
+
+    def get_bookings(self, room_no: str) -> List[Booking]:
+        """All bookings of a room, current one first."""
+        return list(self._calendars.get(room_no, ()))
+
+    def book_room(self, room_no: str, booking: Booking, restore: bool = False) -> None:
+        """Book a stay; the room may hold any number of non-overlapping ones.
+
+        The earliest booking is the room's current one (``is_booked``);
+        later ones wait in its calendar and take over when it is unbooked.
+        A stay before a checked-in current booking is refused. ``restore``
+        brings back an exported booking, so the room's status is not
+        checked (a booked room may since have gone into maintenance).
+        """
+        start, end = booking.span()
+        with self._changing(room_no):
+            room = self._require_room(room_no)
+            if not restore and room.status != "available":
+                raise ValueError(f"Room is not available for booking (status: {room.status})")
+            if self._calendar(room_no).conflict(start, end) is not None:
+                raise ValueError("Room already booked for those dates")
+            self._keep_in_house(room_no, start)
+            self._calendar(room_no).add(booking)
+            self._sync_current(room_no)
 
     def unbook_room(self, room_no: str) -> None:
-        room = self.get_room(room_no)
-        if room is None:
-            raise LookupError("Room not found")
-        room.is_booked = False
-        room.booked_by = None
-        if room_no in self._bookings:
-            del self._bookings[room_no]
+        """Drop the current booking; the next reservation, if any, takes over."""
+        with self._changing(room_no):
+            room = self._require_room(room_no)
+            current = self._bookings.get(room_no)
+            if current is not None:
+                self._calendar(room_no).remove(current)
+                self._sync_current(room_no)
+            else:
+                room.is_booked = False
+                room.booked_by = None
+
+    def cancel_booking(self, room_no: str, confirmation: str) -> Booking:
+        """Remove one booking of a room by confirmation number."""
+        with self._changing(room_no):
+            booking = self._find_booking(room_no, confirmation)
+            self._calendar(room_no).remove(booking)
+            self._sync_current(room_no)
+            return booking
+
+    def remove_booking(self, room_no: str, booking: Booking) -> None:
+        """Remove this very booking object, e.g. to undo a book_room() call."""
+        with self._changing(room_no):
+            calendar = self._calendars.get(room_no)
+            if calendar is None or not any(b is booking for b in calendar):
+                raise LookupError("Booking not found")
+            calendar.remove(booking)
+            self._sync_current(room_no)
+
+    def _find_booking(self, room_no: str, confirmation: Optional[str]) -> Booking:
+        if confirmation is None:
+            booking = self._bookings.get(room_no)
+        else:
+            calendar = self._calendars.get(room_no)
+            booking = calendar.find(confirmation) if calendar else None
+        if booking is None:
+            raise LookupError("Booking not found")
+        return booking
+
+    def find_confirmation(self, confirmation: str) -> Optional[Tuple[str, Booking]]:
+        """(room number, booking) holding a confirmation number, if on the books."""
+        self._load_all()
+        return self._confirmations.get(confirmation)
+
+    def update_booking(
+        self, room_no: str, confirmation: Optional[str] = None, **changes: Any
+    ) -> Booking:
+        """Set attributes (``check_out=...``, ``checked_in=...``) on a booking.
+
+        Targets the current booking unless a confirmation number is given.
+        Date changes are rejected if they would overlap another booking.
+        """
+        with self._changing(room_no):
+            booking = self._find_booking(room_no, confirmation)
+            for name in changes:
+                if not hasattr(booking, name):
+                    raise AttributeError(f"Booking has no field {name!r}")
+            calendar = self._calendar(room_no)
+            moving = "check_in" in changes or "check_out" in changes
+            if moving:
+                start, end = parse_stay(
+                    changes.get("check_in", booking.check_in),
+                    changes.get("check_out", booking.check_out),
+                )
+                if calendar.conflict(start, end, ignore=booking) is not None:
+                    raise ValueError("Room already booked for those dates")
+                self._keep_in_house(room_no, start, booking)
+                calendar.remove(booking)
+            for name, value in changes.items():
+                setattr(booking, name, value)
+            if moving:
+                calendar.add(booking)
+                self._sync_current(room_no)
+            return booking
+
+    def find_available_rooms(self, start: date, end: date) -> List[AbstractRoom]:
+        """Rooms open for booking over ``[start, end)``; O(log n) per room."""
+        free = []
+        for room in list(self.rooms):
+            if room.status != "available":
+                continue
+            calendar = self._calendars.get(room.number)
+            if calendar is None or calendar.conflict(start, end) is None:
+                free.append(room)
+        return free
+
+    # -------- Statistics --------
+    def get_stats(self) -> Dict[str, Any]:
+        """Room counts, occupancy and revenue from the running totals (O(1))."""
+        self._load_all()
+        with self._stats_lock:
+            available, booked, revenue = (
+                self._available_count, self._booked_count, self._revenue
+            )
+        total = len(self._rooms_by_number)
+        return {
+            "totalRooms": total,
+            "availableRooms": available,
+            "bookedRooms": booked,
+            "revenue": round(revenue, 2),
+            "occupancyRate": round(booked / total * 100, 2) if total > 0 else 0,
+        }
+
+    def verify_stats(self) -> None:
+        """Recompute the statistics from scratch and compare with the totals.
+
+        Raises ``AssertionError`` on a mismatch. Meant for tests and the
+        ``HOTEL_CHECK_STATS`` debug mode; only meaningful while no writer
+        is active.
+        """
+        available = len(self.get_available_rooms())
+        booked = len(self.get_booked_rooms())
+        revenue = 0.0
+        for room_no, booking in list(self._bookings.items()):
+            room = self.get_room(room_no)
+            if room:
+                revenue += room.price * booking.nights
+        with self._stats_lock:
+            kept = (self._available_count, self._booked_count, self._revenue)
+        if kept[:2] != (available, booked) or not math.isclose(
+            kept[2], revenue, rel_tol=1e-9, abs_tol=1e-6
+        ):
+            raise AssertionError(
+                f"stats drifted: kept {kept}, recomputed {(available, booked, revenue)}"
+            )
 
     # -------- Serialization helpers --------
     def to_dict(self) -> Dict[str, Any]:
+        self._load_all()
         return {
-            "rooms": [r.to_dict() for r in self.rooms],
+            "rooms": [r.to_dict() for r in list(self._room_list)],
             "bookings": {
-                k: v.to_dict() for k, v in self._bookings.items()
+                k: v.to_dict() for k, v in list(self._bookings.items())
+            },
+            # future stays beyond each room's current booking
+            "reservations": {
+                k: [b.to_dict() for b in self._reservations(k)]
+                for k in list(self._calendars)
+                if len(self._calendars.get(k, ())) > 1
             },
         }
 
@@ -148,10 +999,11 @@ class Hotel:
             "SuiteRoom": SuiteRoom,
         }.get(room_type, SuiteRoom)
         room = cls(number, price)
-        room.is_booked = bool(data.get("isBooked", False))
-        room.booked_by = data.get("bookedBy")
+        # isBooked/bookedBy are not read: they follow the room's bookings
         room.status = data.get("status", "available")
-        room.amenities = data.get("amenities", [])
+        amenities = data.get("amenities") or []
+        # older files may hold a single value instead of a list
+        room.amenities = amenities if isinstance(amenities, list) else [amenities]
         room.notes = data.get("notes")
         return room
 
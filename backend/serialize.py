@@ -0,0 +1,128 @@
+from __future__ import annotations
+import json
+import threading
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON
+    orjson = None
+
+from models import AbstractRoom, Hotel
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, through orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def backend_name() -> str:
+    return "orjson" if orjson is not None else "json"
+
+
+# distinct ?fields= selections cached per room
+MAX_PROJECTIONS = 8
+
+
+class _Fragment:
+    __slots__ = ("version", "room", "public", "encoded", "projections")
+
+    def __init__(self, version: int, room: AbstractRoom, public: Dict[str, Any]) -> None:
+        self.version = version
+        self.room = room
+        self.public = public
+        self.encoded = dumps(public)
+        # fields tuple -> encoded projection, filled as ?fields= asks for them
+        self.projections: Dict[Tuple[str, ...], bytes] = {}
+
+    def project(self, fields: Tuple[str, ...]) -> bytes:
+        encoded = self.projections.get(fields)
+        if encoded is None:
+            if len(self.projections) >= MAX_PROJECTIONS:
+                self.projections.clear()
+            encoded = self.projections[fields] = dumps(
+                {k: self.public[k] for k in fields if k in self.public}
+            )
+        return encoded
+
+
+class RoomSerializer:
+    """Public room representation, encoded once per room change.
+
+    Each room's public dict and its encoded JSON fragment (plus encoded
+    ``?fields=`` projections) are cached under
+    ``hotel.room_version(number)``, so a change re-encodes only that room.
+    Lists are built by joining the cached fragments.
+    """
+
+    def __init__(self, hotel: Hotel) -> None:
+        self.hotel = hotel
+        self._lock = threading.Lock()
+        self._cache: Dict[str, _Fragment] = {}
+        # per thread: [rooms served, rooms encoded afresh] since take_counts()
+        self._counts = threading.local()
+
+    def _entry(self, room: AbstractRoom) -> _Fragment:
+        # read the version first: a change racing with the encoding then
+        # leaves an entry that is already stale and gets redone next time
+        version = self.hotel.room_version(room.number)
+        entry = self._cache.get(room.number)
+        if entry is not None and entry.version == version and entry.room is room:
+            return entry
+        entry = _Fragment(version, room, self._build(room))
+        self._count(0, 1)
+        with self._lock:
+            if len(self._cache) > 2 * len(self.hotel._rooms_by_number) + 64:
+                # drop rooms that no longer exist
+                self._cache = {
+                    n: e for n, e in self._cache.items() if self.hotel.get_room(n) is e.room
+                }
+            self._cache[room.number] = entry
+        return entry
+
+    def _count(self, served: int, encoded: int) -> None:
+        counts = getattr(self._counts, "value", None)
+        if counts is None:
+            counts = self._counts.value = [0, 0]
+        counts[0] += served
+        counts[1] += encoded
+
+    def take_counts(self) -> Tuple[int, int]:
+        """(rooms served, rooms encoded afresh) on this thread since the last call."""
+        counts = getattr(self._counts, "value", None)
+        if counts is None:
+            return 0, 0
+        self._counts.value = None
+        return counts[0], counts[1]
+
+    def _build(self, room: AbstractRoom) -> Dict[str, Any]:
+        result = {
+            **room.to_dict(),
+            "description": room.get_description(),
+        }
+        # Include all booking details if room is booked
+        booking = self.hotel._bookings.get(room.number)
+        if room.is_booked and booking is not None:
+            result.update(booking.to_dict())
+        return result
+
+    def public(self, room: AbstractRoom) -> Dict[str, Any]:
+        """The room as the API shows it; a fresh dict the caller may change."""
+        self._count(1, 0)
+        return dict(self._entry(room).public)
+
+    def encode(self, room: AbstractRoom) -> bytes:
+        self._count(1, 0)
+        return self._entry(room).encoded
+
+    def encode_list(self, rooms: Iterable[AbstractRoom], fields: Optional[Sequence[str]] = None) -> bytes:
+        """JSON array of rooms, optionally projected onto ``fields``."""
+        if fields:
+            wanted = tuple(fields)
+            parts = [self._entry(room).project(wanted) for room in rooms]
+        else:
+            parts = [self._entry(room).encoded for room in rooms]
+        self._count(len(parts), 0)
+        return b"[" + b",".join(parts) + b"]"
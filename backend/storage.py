@@ -1,11 +1,44 @@
 from __future__ import annotations
+import gc
 import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
 
 from models import Hotel, Booking
 
 
+@contextmanager
+def _gc_paused():
+    """Hold off the cyclic GC while a load allocates millions of objects.
+
+    Every full collection walks everything allocated so far, so letting it
+    run during a load makes the load quadratic in the hotel size.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Make a rename in ``directory`` durable (a no-op where unsupported)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
 class JsonHotelRepository:
     """Simple JSON file persistence for the Hotel aggregate.
 
@@ -13,39 +46,582 @@ class JsonHotelRepository:
     small demo. For production, swap this with a proper database layer.
     """
 
-    def __init__(self, file_path: Path) -> None:
+    def __init__(self, file_path: Path, fsync: bool = False) -> None:
         self.file_path = file_path
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        # force every write to disk before save() returns
+        self.fsync = fsync
+        # serializes writers so concurrent saves never share the .tmp file
+        self._lock = threading.Lock()
 
     def load(self) -> Hotel:
         hotel = Hotel()
         if not self.file_path.exists():
             return hotel
 
+        with _gc_paused():
+            self._load_into(hotel)
+        # freshly loaded state is already on disk
+        hotel.drain_changes()
+        return hotel
+
+    def _load_into(self, hotel: Hotel) -> None:
         with self.file_path.open("r", encoding="utf-8") as f:
             data: Dict[str, Any] = json.load(f)
 
-        for r in data.get("rooms", []):
+        rooms = data.pop("rooms", [])
+        bookings = data.pop("bookings", {})
+        reservations = data.pop("reservations", {})
+        items = []
+        for i, r in enumerate(rooms):
             room = Hotel.room_from_dict(r)
-            hotel.rooms.append(room)
+            # drop each parsed record once converted, so the raw JSON and
+            # the objects built from it are never both fully in memory
+            rooms[i] = None
+            stays = [Hotel.booking_from_dict(b) for b in reservations.pop(room.number, ())]
+            current = bookings.pop(room.number, None)
+            if current is not None:
+                stays.insert(0, Hotel.booking_from_dict(current))
+            items.append((room, stays))
+        hotel.load_rooms(items)
 
-        bookings = data.get("bookings", {})
+        # bookings whose room is gone (hand-edited files)
         for room_no, b in bookings.items():
-            booking = Hotel.booking_from_dict(b)
-            # mirror state into room list
-            room = hotel.get_room(room_no)
-            if room is not None:
-                room.is_booked = True
-                room.booked_by = booking.guest_name
-            hotel._bookings[room_no] = booking
-
-        return hotel
+            hotel.restore_booking(room_no, Hotel.booking_from_dict(b))
+        for room_no, stays in reservations.items():
+            for b in stays:
+                hotel.restore_booking(room_no, Hotel.booking_from_dict(b))
 
     def save(self, hotel: Hotel) -> None:
-        payload = hotel.to_dict()
+        # Take the payload inside the lock: whichever save runs last then
+        # reflects every mutation that finished before it started.
+        with self._lock:
+            hotel.drain_changes()
+            self._write_snapshot(hotel.to_dict())
+
+    def _write_snapshot(self, payload: Dict[str, Any]) -> None:
         tmp_path = self.file_path.with_suffix(".tmp")
         with tmp_path.open("w", encoding="utf-8") as f:
             json.dump(payload, f, ensure_ascii=False, indent=2)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
         tmp_path.replace(self.file_path)
+        if self.fsync:
+            _fsync_dir(self.file_path.parent)
+
+
+class JournaledHotelRepository(JsonHotelRepository):
+    """JSON snapshot plus an append-only journal of per-room records.
+
+    ``save`` appends one compact line per room touched since the last save
+    (see :meth:`Hotel.room_record`) instead of rewriting the snapshot, so a
+    mutation costs the same however big the hotel is. Every
+    ``snapshot_every`` records the journal is rotated aside and a fresh
+    snapshot is written by a background thread; ``load`` replays any
+    rotated and live journal on top of the last snapshot, and finishes an
+    interrupted compaction.
+    """
+
+    def __init__(self, file_path: Path, snapshot_every: int = 1000, fsync: bool = False) -> None:
+        super().__init__(file_path, fsync=fsync)
+        self.journal_path = file_path.with_suffix(".journal")
+        self.rotated_path = file_path.with_suffix(".journal.old")
+        self.snapshot_every = snapshot_every
+        self._journal = None
+        self._records = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> Hotel:
+        hotel = super().load()
+        for path in (self.rotated_path, self.journal_path):
+            self._records += self._replay(hotel, path)
+        hotel.drain_changes()
+        if self.rotated_path.exists():
+            # A compaction did not finish. Finish it now, before the next
+            # rotation would overwrite the segment; the snapshot holds both
+            # journals, so they can go.
+            self._write_snapshot(self._snapshot(hotel))
+            self.rotated_path.unlink()
+            self.journal_path.unlink(missing_ok=True)
+            self._records = 0
+        return hotel
+
+    def _replay(self, hotel: Hotel, path: Path) -> int:
+        if not path.exists():
+            return 0
+        with path.open("rb+") as f:
+            data = f.read()
+            if data[-1:] not in (b"", b"\n"):
+                # drop a record torn by a crash so the next append starts clean
+                f.truncate(data.rfind(b"\n") + 1)
+                if self.fsync:
+                    os.fsync(f.fileno())
+        count = 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            hotel.apply_record(record)
+            count += 1
+        return count
+
+    def save(self, hotel: Hotel) -> None:
+        with self._lock:
+            changes = hotel.drain_changes()
+            if not changes:
+                return
+            if self._journal is None:
+                self._journal = self.journal_path.open("a", encoding="utf-8")
+            for room_no in changes:
+                line = json.dumps(
+                    hotel.room_record(room_no), ensure_ascii=False, separators=(",", ":")
+                )
+                self._journal.write(line + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._records += len(changes)
+            if self._records >= self.snapshot_every:
+                self._start_compaction(hotel)
+
+    def _start_compaction(self, hotel: Hotel) -> None:
+        # Only one rotated segment may exist at a time: while the previous
+        # snapshot is still being written, keep appending and retry on a
+        # later save rather than wait for it here.
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._journal.close()
+        self._journal = None
+        self.journal_path.replace(self.rotated_path)
+        self._records = 0
+        self._compactor = threading.Thread(
+            target=self._compact, args=(hotel,), name="journal-compactor", daemon=True
+        )
+        self._compactor.start()
+
+    def _compact(self, hotel: Hotel) -> None:
+        self._write_snapshot(self._snapshot(hotel))
+        self.rotated_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _snapshot(hotel: Hotel) -> Dict[str, Any]:
+        """``hotel.to_dict()``, taken one room at a time under its lock.
+
+        Built while requests keep running, so it may include changes made
+        after the rotation; those are in the new journal too, and records
+        are absolute, so replaying them on top is harmless.
+        """
+        rooms: List[Dict[str, Any]] = []
+        bookings: Dict[str, Any] = {}
+        reservations: Dict[str, Any] = {}
+        for room in list(hotel.rooms):
+            record = hotel.room_record(room.number)
+            if record["op"] != "put":
+                continue  # removed since the list was taken
+            rooms.append(record["room"])
+            if record["booking"]:
+                bookings[room.number] = record["booking"]
+            if record["reservations"]:
+                reservations[room.number] = record["reservations"]
+        return {"rooms": rooms, "bookings": bookings, "reservations": reservations}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._compactor is not None:
+                self._compactor.join()
+                self._compactor = None
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+class SqliteHotelRepository:
+    """SQLite persistence with one row per room and per booking.
+
+    A room may have many bookings; the room's current one is simply its
+    earliest, so no flag is stored for it.
+
+    Uses the stdlib ``sqlite3`` module in WAL mode. ``save`` upserts only
+    the rooms touched since the last save, in a single transaction. When
+    the database is created next to an existing JSON data file, that file
+    is imported once so switching backends keeps the current state.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rooms (
+            number TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            price REAL NOT NULL,
+            is_booked INTEGER NOT NULL DEFAULT 0,
+            booked_by TEXT,
+            status TEXT NOT NULL DEFAULT 'available',
+            amenities TEXT NOT NULL DEFAULT '[]',
+            notes TEXT
+        );
+        CREATE INDEX IF NOT EXISTS rooms_status ON rooms (status);
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY,
+            room_no TEXT NOT NULL REFERENCES rooms (number) ON DELETE CASCADE,
+            guest_name TEXT NOT NULL,
+            check_in TEXT NOT NULL,
+            check_out TEXT NOT NULL,
+            guest_email TEXT,
+            guest_phone TEXT,
+            guest_count INTEGER NOT NULL DEFAULT 1,
+            confirmation_number TEXT,
+            notes TEXT,
+            checked_in INTEGER NOT NULL DEFAULT 0,
+            checked_out INTEGER NOT NULL DEFAULT 0,
+            check_in_time TEXT,
+            check_out_time TEXT
+        );
+        CREATE INDEX IF NOT EXISTS bookings_room ON bookings (room_no, check_in);
+        CREATE INDEX IF NOT EXISTS bookings_check_out ON bookings (check_out);
+        CREATE INDEX IF NOT EXISTS bookings_confirmation ON bookings (confirmation_number);
+    """
+
+    ROOM_COLUMNS = (
+        "number", "type", "price", "is_booked", "booked_by", "status", "amenities", "notes",
+    )
+    BOOKING_COLUMNS = (
+        "room_no", "guest_name", "check_in", "check_out", "guest_email", "guest_phone",
+        "guest_count", "confirmation_number", "notes", "checked_in", "checked_out",
+        "check_in_time", "check_out_time",
+    )
+
+    def __init__(
+        self, db_path: Path, json_path: Optional[Path] = None, lazy: bool = False, fsync: bool = False
+    ) -> None:
+        self.db_path = db_path
+        self.lazy = lazy
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        fresh = not self.db_path.exists()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL syncs only at WAL checkpoints; FULL syncs every commit
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(self.SCHEMA)
+        if fresh and json_path is not None and json_path.exists():
+            self.migrate_from_json(json_path)
+        # lazy loads read through their own connection: they may run while
+        # a save holds _lock and waits for a room lock the loading thread has
+        self._read_lock = threading.Lock()
+        self._reader: Optional[sqlite3.Connection] = None
+
+    def migrate_from_json(self, json_path: Path) -> None:
+        """One-shot import of a ``data.json`` file into this database."""
+        hotel = JsonHotelRepository(json_path).load()
+        self._write(hotel, [r.number for r in hotel.rooms])
+
+    def load(self) -> Hotel:
+        """Load every room, or with ``lazy`` only the room numbers.
+
+        In lazy mode rooms are fetched by primary key when the hotel first
+        touches them (see :meth:`Hotel.defer`).
+        """
+        hotel = Hotel()
+        if self.lazy:
+            with self._lock:
+                numbers = [n for (n,) in self._conn.execute("SELECT number FROM rooms ORDER BY rowid")]
+            hotel.defer(numbers, self._fetch)
+            return hotel
+
+        with self._lock:
+            rooms = self._conn.execute(
+                f"SELECT {', '.join(self.ROOM_COLUMNS)} FROM rooms ORDER BY rowid"
+            ).fetchall()
+            bookings = self._conn.execute(
+                f"SELECT {', '.join(self.BOOKING_COLUMNS)} FROM bookings ORDER BY id"
+            ).fetchall()
+        with _gc_paused():
+            hotel.load_rooms(self._assemble(rooms, bookings))
+        hotel.drain_changes()
+        return hotel
+
+    def _assemble(self, rooms: List[tuple], bookings: List[tuple]) -> List[Tuple[Any, List[Booking]]]:
+        """(room, bookings) pairs from room and booking rows."""
+        stays: Dict[str, List[Booking]] = {}
+        for row in bookings:
+            stays.setdefault(row[0], []).append(
+                Hotel.booking_from_dict(self._booking_row_to_dict(row))
+            )
+        return [
+            (Hotel.room_from_dict(self._room_row_to_dict(row)), stays.get(row[0], []))
+            for row in rooms
+        ]
+
+    def _fetch(self, numbers: List[str]) -> List[Tuple[Any, List[Booking]]]:
+        """Loader for lazy mode: the given rooms with their bookings."""
+        room_sql = f"SELECT {', '.join(self.ROOM_COLUMNS)} FROM rooms WHERE number IN "
+        booking_sql = f"SELECT {', '.join(self.BOOKING_COLUMNS)} FROM bookings WHERE room_no IN "
+        rooms: List[tuple] = []
+        bookings: List[tuple] = []
+        with self._read_lock:
+            if self._reader is None:
+                self._reader = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            # stay under SQLite's host-parameter limit
+            for i in range(0, len(numbers), 500):
+                chunk = numbers[i:i + 500]
+                marks = f"({', '.join('?' * len(chunk))})"
+                rooms += self._reader.execute(room_sql + marks, chunk).fetchall()
+                bookings += self._reader.execute(booking_sql + marks + " ORDER BY id", chunk).fetchall()
+        return self._assemble(rooms, bookings)
+
+    def save(self, hotel: Hotel) -> None:
+        changes = hotel.drain_changes()
+        if changes:
+            self._write(hotel, changes)
+
+    def _write(self, hotel: Hotel, room_numbers: Iterable[str]) -> None:
+        room_sql = (
+            f"INSERT INTO rooms ({', '.join(self.ROOM_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(self.ROOM_COLUMNS))}) "
+            "ON CONFLICT (number) DO UPDATE SET "
+            + ", ".join(f"{c} = excluded.{c}" for c in self.ROOM_COLUMNS[1:])
+        )
+        booking_sql = (
+            f"INSERT INTO bookings ({', '.join(self.BOOKING_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(self.BOOKING_COLUMNS))})"
+        )
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                for room_no in room_numbers:
+                    record = hotel.room_record(room_no)
+                    if record["op"] == "delete":
+                        cur.execute("DELETE FROM rooms WHERE number = ?", (room_no,))
+                        continue
+                    cur.execute(room_sql, self._room_dict_to_row(record["room"]))
+                    # a room's bookings are few: replace them as a set
+                    cur.execute("DELETE FROM bookings WHERE room_no = ?", (room_no,))
+                    stays = [record["booking"]] + record["reservations"]
+                    cur.executemany(
+                        booking_sql,
+                        [self._booking_dict_to_row(room_no, b) for b in stays if b],
+                    )
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _room_dict_to_row(d: Dict[str, Any]) -> tuple:
+        return (
+            d["number"], d["type"], d["price"], int(d["isBooked"]), d["bookedBy"],
+            d["status"], json.dumps(d["amenities"]), d["notes"],
+        )
+
+    @staticmethod
+    def _room_row_to_dict(row: tuple) -> Dict[str, Any]:
+        number, rtype, price, is_booked, booked_by, status, amenities, notes = row
+        return {
+            "number": number, "type": rtype, "price": price, "isBooked": bool(is_booked),
+            "bookedBy": booked_by, "status": status, "amenities": json.loads(amenities),
+            "notes": notes,
+        }
+
+    @staticmethod
+    def _booking_dict_to_row(room_no: str, d: Dict[str, Any]) -> tuple:
+        return (
+            room_no, d["guestName"], d["checkIn"], d["checkOut"], d["guestEmail"],
+            d["guestPhone"], d["guestCount"], d["confirmationNumber"], d["notes"],
+            int(d["checkedIn"]), int(d["checkedOut"]), d["checkInTime"], d["checkOutTime"],
+        )
+
+    @staticmethod
+    def _booking_row_to_dict(row: tuple) -> Dict[str, Any]:
+        return {
+            "guestName": row[1], "checkIn": row[2], "checkOut": row[3],
+            "guestEmail": row[4], "guestPhone": row[5], "guestCount": row[6],
+            "confirmationNumber": row[7], "notes": row[8], "checkedIn": bool(row[9]),
+            "checkedOut": bool(row[10]), "checkInTime": row[11], "checkOutTime": row[12],
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+        with self._read_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+
+def open_repository(kind: str, file_path: Path, lazy: bool = False, fsync: bool = False):
+    """Build the repository selected by ``kind`` ("json", "journal" or "sqlite").
+
+    ``file_path`` is the JSON data file; the SQLite database lives beside it
+    as ``<name>.db`` and is seeded from the JSON file the first time.
+    ``lazy`` loads rooms on first access and needs the indexed (sqlite)
+    backend. ``fsync`` makes every save durable before it returns.
+    """
+    if lazy and kind != "sqlite":
+        raise ValueError("Lazy loading needs the sqlite storage backend")
+    if kind == "json":
+        return JsonHotelRepository(file_path, fsync=fsync)
+    if kind == "journal":
+        return JournaledHotelRepository(file_path, fsync=fsync)
+    if kind == "sqlite":
+        return SqliteHotelRepository(
+            file_path.with_suffix(".db"), json_path=file_path, lazy=lazy, fsync=fsync
+        )
+    raise ValueError(f"Unknown storage backend: {kind}")
+
+
+class PersistenceScheduler:
+    """Decides when a repository save actually happens.
+
+    ``save()`` is called after every mutation. The mode trades latency for
+    durability:
+
+    - "sync": the caller writes (and fsyncs, if the repository does)
+      before ``save()`` returns; concurrent callers queue on the write.
+    - "group": the caller waits for the next flush by a writer thread. The
+      writer waits ``window`` seconds after the first request, then one
+      save covers every request made by then.
+    - "async": ``save()`` returns at once and the writer flushes within
+      ``window``. A caller that finds unflushed changes older than
+      ``max_lag`` waits for them, so at most that much is ever at risk.
+
+    A save drains every change made before it starts, so one flush covers
+    all requests made before it (see :meth:`Hotel.drain_changes`).
+    """
+
+    MODES = ("sync", "group", "async")
+
+    def __init__(
+        self,
+        repo,
+        hotel: Hotel,
+        mode: str = "sync",
+        window: float = 0.005,
+        max_lag: float = 1.0,
+        on_flush: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown persistence mode: {mode}")
+        self.repo = repo
+        self.hotel = hotel
+        self.mode = mode
+        self.window = window
+        self.max_lag = max_lag
+        # called with the seconds each flush took, e.g. for metrics
+        self.on_flush = on_flush
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        # save() calls so far, and how many of them a finished flush covers
+        self._requested = 0
+        self._flushed = 0
+        # monotonic time of the oldest request no flush has started on
+        self._oldest: Optional[float] = None
+        # (first, last request, error) of the latest failed flush
+        self._failure: Optional[Tuple[int, int, BaseException]] = None
+        self._flushes = 0
+        self._flush_total = 0.0
+        self._flush_last = 0.0
+        self._flush_max = 0.0
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
+        if mode != "sync":
+            self._writer = threading.Thread(target=self._run, name="hotel-writer", daemon=True)
+            self._writer.start()
+
+    def save(self) -> None:
+        if self.mode == "sync":
+            with self._cond:
+                self._requested += 1
+            try:
+                self._flush()
+            finally:
+                with self._cond:
+                    self._flushed += 1
+            return
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Persistence scheduler is closed")
+            self._requested += 1
+            ticket = self._requested
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._cond.notify_all()
+            if self.mode == "async" and time.monotonic() - self._oldest <= self.max_lag:
+                return
+            while self._flushed < ticket:
+                self._cond.wait()
+            failure = self._failure
+        if failure is not None and failure[0] <= ticket <= failure[1]:
+            raise failure[2]
+
+    def _flush(self) -> None:
+        # time the write alone, not the wait for another caller's write
+        with self._write_lock:
+            start = time.perf_counter()
+            self.repo.save(self.hotel)
+            elapsed = time.perf_counter() - start
+        with self._cond:
+            self._flushes += 1
+            self._flush_total += elapsed
+            self._flush_last = elapsed
+            self._flush_max = max(self._flush_max, elapsed)
+        if self.on_flush is not None:
+            self.on_flush(elapsed)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._oldest is None and not self._closed:
+                    self._cond.wait()
+                if self._oldest is None:
+                    return
+                oldest = self._oldest
+            # let concurrent requests join this flush
+            delay = self.window - (time.monotonic() - oldest)
+            if delay > 0 and not self._closed:
+                time.sleep(delay)
+            with self._cond:
+                first, target = self._flushed + 1, self._requested
+                self._oldest = None
+            error = None
+            try:
+                self._flush()
+            except Exception as e:  # reported to the waiting callers
+                error = e
+            with self._cond:
+                self._flushed = target
+                if error is not None:
+                    self._failure = (first, target, error)
+                self._cond.notify_all()
 
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            result = {
+                "mode": self.mode,
+                "saves": self._requested,
+                "flushes": self._flushes,
+                "pending": self._requested - self._flushed,
+                "lastFlushMs": round(self._flush_last * 1e3, 3),
+                "avgFlushMs": round(self._flush_total / self._flushes * 1e3, 3) if self._flushes else None,
+                "maxFlushMs": round(self._flush_max * 1e3, 3),
+                "lastError": str(self._failure[2]) if self._failure else None,
+            }
+        if self.mode != "sync":
+            result["windowMs"] = self.window * 1e3
+        if self.mode == "async":
+            result["maxLagMs"] = self.max_lag * 1e3
+        return result
 
+    def close(self) -> None:
+        """Flush whatever is pending and stop the writer."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._writer is not None:
+            self._writer.join()
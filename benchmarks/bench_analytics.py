@@ -0,0 +1,82 @@
+"""Occupancy / ADR / RevPAR report time over a year of bookings.
+
+Run from the project root (needs numpy):
+
+    python benchmarks/bench_analytics.py --rooms 10000
+
+Every room gets back-to-back stays of 1-6 nights with a free night
+between them for a whole year, half of them already checked out into
+the archive. "cold" includes turning every booking into columns;
+"after a booking" re-reads only the room that changed.
+"""
+from __future__ import annotations
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from analytics import Analytics  # noqa: E402
+from archive import BookingArchive  # noqa: E402
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+
+YEAR = date(2025, 1, 1)
+
+
+def build(rooms: int, archive: BookingArchive) -> tuple[Hotel, int]:
+    hotel = Hotel()
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    rng = random.Random(rooms)
+    midyear = YEAR + timedelta(days=182)
+    count = 0
+    for i in range(rooms):
+        room = classes[i % 3](str(i), 1000.0 + 500 * (i % 3))
+        hotel.add_room(room)
+        day = YEAR
+        while day < YEAR + timedelta(days=365):
+            end = day + timedelta(days=rng.randint(1, 6))
+            booking = Booking(
+                "Guest", day.isoformat(), end.isoformat(),
+                confirmation_number=f"C{count:08d}",
+                check_out_time=end.isoformat() + "T11:00:00",
+            )
+            if end < midyear:
+                archive.append(room, booking)
+            else:
+                hotel.restore_booking(room.number, booking)
+            count += 1
+            day = end + timedelta(days=1)
+    return hotel, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=10_000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        archive = BookingArchive(workdir / "archive")
+        hotel, count = build(args.rooms, archive)
+        analytics = Analytics(hotel, archive)
+        print(f"{args.rooms} rooms, {count} bookings")
+
+        timings = []
+        for label, change in (("cold", False), ("warm", False), ("after a booking", True)):
+            if change:
+                hotel.update_booking("0", notes="late arrival")
+            start = time.perf_counter()
+            analytics.report(YEAR, date(2025, 12, 31), "type")
+            timings.append(f"{label} {(time.perf_counter() - start) * 1e3:.1f} ms")
+        print("year report by type: " + ", ".join(timings))
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
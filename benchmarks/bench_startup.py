@@ -0,0 +1,99 @@
+"""Startup (repository load) time and peak memory versus hotel size.
+
+Run from the project root:
+
+    python benchmarks/bench_startup.py --sizes 1000 10000 100000
+
+Each size is seeded as a data.json where every room has a current
+booking and one future reservation, then opened with each storage
+backend (the SQLite database is imported beforehand). Time is a plain
+``load()``; peak memory is a second ``load()`` under tracemalloc.
+"sqlite-lazy" is ``load()`` plus one room lookup in lazy mode.
+
+Before / after bulk loading (load time in ms):
+
+    rooms   json            journal         sqlite          sqlite-lazy
+    1k      156 -> 47       118 -> 42       350 -> 40       1.6
+    10k     1679 -> 701     1359 -> 582     2523 -> 549     7.3
+    100k    23158 -> 6258   24686 -> 6539   50210 -> 9105   113
+
+Peak memory at 100k: 627 -> 457 MiB for JSON, 18 MiB lazy.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+from storage import open_repository  # noqa: E402
+
+BACKENDS = (("json", {}), ("journal", {}), ("sqlite", {}), ("sqlite-lazy", {"lazy": True}))
+
+
+def seed(data_path: Path, rooms: int) -> None:
+    hotel = Hotel()
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    for i in range(rooms):
+        room = classes[i % 3](str(i), 1000.0 + i % 500)
+        room.amenities = ["wifi"]
+        hotel.add_room(room)
+        for n, (check_in, check_out) in enumerate((("2025-01-01", "2025-01-04"),
+                                                   ("2025-02-01", "2025-02-03"))):
+            hotel.book_room(room.number, Booking(
+                f"Guest {i}", check_in, check_out,
+                guest_email=f"guest{i}@example.com", confirmation_number=f"C{i:07d}{n}",
+            ))
+    open_repository("json", data_path).save(hotel)
+
+
+def load(kind: str, data_path: Path, **options) -> Hotel:
+    repo = open_repository(kind.split("-")[0], data_path, **options)
+    hotel = repo.load()
+    hotel.get_room("0")
+    return hotel
+
+
+def measure(kind: str, data_path: Path, **options) -> tuple[float, int]:
+    gc.collect()
+    start = time.perf_counter()
+    hotel = load(kind, data_path, **options)
+    elapsed = time.perf_counter() - start
+    assert hotel.get_room("0") is not None
+    del hotel
+    gc.collect()
+    tracemalloc.start()
+    try:
+        load(kind, data_path, **options)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'rooms':>8} {'backend':>12} {'load (ms)':>10} {'peak (MiB)':>11}")
+    for size in args.sizes:
+        workdir = Path(tempfile.mkdtemp())
+        try:
+            seed(workdir / "data.json", size)
+            open_repository("sqlite", workdir / "data.json").close()
+            for kind, options in BACKENDS:
+                elapsed, peak = measure(kind, workdir / "data.json", **options)
+                print(f"{size:>8} {kind:>12} {elapsed * 1e3:>10.1f} {peak / 2**20:>11.1f}")
+        finally:
+            shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
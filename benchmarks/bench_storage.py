@@ -0,0 +1,91 @@
+"""Mutation and cold-start latency for each storage backend.
+
+Run from the project root:
+
+    python benchmarks/bench_storage.py --rooms 10000 --bookings 100000
+
+Each backend is seeded with the same synthetic hotel, then timed on a
+cold ``load()`` and on a single price change followed by ``save()``.
+"""
+from __future__ import annotations
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom  # noqa: E402
+from storage import open_repository  # noqa: E402
+
+BACKENDS = ("json", "journal", "sqlite")
+
+
+def build_hotel(rooms: int, bookings: int) -> Hotel:
+    hotel = Hotel()
+    classes = (SingleRoom, DoubleRoom, SuiteRoom)
+    for i in range(rooms):
+        hotel.add_room(classes[i % 3](str(i), 1000.0 + i % 500))
+    # consecutive three-night stays, spread round-robin over the rooms
+    start = date(2025, 1, 1)
+    for i in range(bookings):
+        check_in = start + timedelta(days=3 * (i // rooms))
+        hotel.book_room(
+            str(i % rooms),
+            Booking(
+                f"Guest {i}",
+                check_in.isoformat(),
+                (check_in + timedelta(days=3)).isoformat(),
+                confirmation_number=f"C{i:08d}",
+            ),
+        )
+    return hotel
+
+
+def bench(kind: str, rooms: int, bookings: int, mutations: int) -> tuple[float, float]:
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        data_path = workdir / "data.json"
+        hotel = build_hotel(rooms, bookings)
+        # every backend starts from the same data.json (sqlite imports it)
+        open_repository("json", data_path).save(hotel)
+        repo = open_repository(kind, data_path)
+
+        timings = []
+        for i in range(mutations):
+            no = str(i % rooms)
+            hotel.set_room_price(no, 2000.0 + i)
+            start = time.perf_counter()
+            repo.save(hotel)
+            timings.append(time.perf_counter() - start)
+        if hasattr(repo, "close"):
+            repo.close()
+
+        start = time.perf_counter()
+        open_repository(kind, data_path).load()
+        cold = time.perf_counter() - start
+        return statistics.median(timings) * 1e3, cold * 1e3
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--bookings", type=int, default=100_000)
+    parser.add_argument("--mutations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.rooms} rooms, {args.bookings} bookings")
+    print(f"{'backend':>8} {'mutation p50 (ms)':>18} {'cold start (ms)':>16}")
+    for kind in BACKENDS:
+        mutation_ms, cold_ms = bench(kind, args.rooms, args.bookings, args.mutations)
+        print(f"{kind:>8} {mutation_ms:>18.3f} {cold_ms:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
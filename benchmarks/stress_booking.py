@@ -0,0 +1,115 @@
+"""Concurrent booking stress check against the Flask app.
+
+Run from the project root:
+
+    python benchmarks/stress_booking.py --requests 4000 --threads 32
+
+Fires parallel booking and price-change requests at a small set of rooms
+and exits non-zero if any room was double-booked or if the state
+reloaded from disk is missing an acknowledged update.
+"""
+from __future__ import annotations
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import create_app  # noqa: E402
+from storage import open_repository  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--storage", default="journal")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    data_path = workdir / "data.json"
+    try:
+        app = create_app(data_path, storage=args.storage)
+        app.config["CHECK_STATS"] = True
+        setup = app.test_client()
+        for i in range(args.rooms):
+            setup.post("/rooms", json={"number": str(i), "price": 1000, "type": "SingleRoom"})
+
+        local = threading.local()
+        winners: dict[str, str] = {}
+        repriced: set[str] = set()
+        results_lock = threading.Lock()
+        rng = random.Random(0)
+        jobs = [(rng.randrange(args.rooms), n) for n in range(args.requests)]
+        # the API refuses stays that have already ended
+        check_in = date.today() + timedelta(days=1)
+        stay = {"checkIn": check_in.isoformat(), "checkOut": (check_in + timedelta(days=1)).isoformat()}
+
+        def fire(job: tuple[int, int]) -> None:
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = app.test_client()
+            room, n = job
+            no = str(room)
+            if n % 4 == 0:
+                # rejected once the room is booked, applied while it is free
+                resp = client.put(f"/rooms/{no}", json={"price": 2000 + n})
+                if resp.status_code == 200:
+                    with results_lock:
+                        repriced.add(no)
+                return
+            resp = client.post(
+                f"/rooms/{no}/book",
+                json={"guestName": f"G{n}", **stay},
+            )
+            if resp.status_code == 200:
+                with results_lock:
+                    if no in winners:
+                        raise AssertionError(f"room {no} double-booked")
+                    winners[no] = resp.get_json()["confirmationNumber"]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            list(pool.map(fire, jobs))
+        elapsed = time.perf_counter() - start
+
+        reloaded = open_repository(args.storage, data_path).load()
+        failures = []
+        for no, confirmation in winners.items():
+            booking = reloaded._bookings.get(no)
+            if booking is None or booking.confirmation_number != confirmation:
+                failures.append(f"room {no}: booking {confirmation} lost")
+        booked = Counter(r.is_booked for r in reloaded.rooms)[True]
+        if booked != len(winners):
+            failures.append(f"{booked} rooms booked on disk, {len(winners)} acknowledged")
+        if setup.get("/stats").status_code != 200:
+            failures.append("running statistics drifted from a full recompute")
+        # whatever the server holds in memory must also have reached disk
+        for served in setup.get("/rooms").get_json():
+            stored = reloaded.get_room(served["number"])
+            if stored is None or stored.price != served["price"]:
+                failures.append(f"room {served['number']}: price {served['price']} lost")
+
+        print(
+            f"{args.requests} requests on {args.threads} threads in {elapsed:.2f}s "
+            f"({args.requests / elapsed:.0f} req/s); {len(winners)} bookings, "
+            f"{len(repriced)} rooms repriced"
+        )
+        for failure in failures:
+            print("FAIL", failure)
+        return 1 if failures else 0
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -122,6 +122,26 @@ const API = {
   // Get notifications
   async getNotifications() {
     return await this.request('/notifications');
+  },
+
+  // Subscribe to live room/booking changes (server-sent events).
+  // The browser reconnects on its own and resumes from the last event id.
+  subscribeToChanges(onChange) {
+    if (typeof EventSource === 'undefined') {
+      return null;
+    }
+    const source = new EventSource(`${this.baseURL}/events`);
+    const types = [
+      'room_added', 'room_updated', 'room_removed', 'booked', 'unbooked',
+      'booking_updated', 'booking_cancelled', 'checked_in', 'checked_out',
+      'status_changed', 'amenities_changed', 'bulk_imported', 'batch_applied', 'resync'
+    ];
+    types.forEach(type => {
+      source.addEventListener(type, (event) => {
+        onChange(type, event.data ? JSON.parse(event.data) : {});
+      });
+    });
+    return source;
   }
 };
 
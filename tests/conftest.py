@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# backend modules import each other by top-level name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,60 @@
+"""Amenity lists: validated on the way in, tolerated in old data."""
+from __future__ import annotations
+import json
+
+import pytest
+
+import models
+from app import create_app
+from models import Hotel, SingleRoom
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = create_app(tmp_path / "data.json").test_client()
+    client.post("/rooms", json={"number": "1", "type": "SingleRoom", "price": 100})
+    return client
+
+
+@pytest.mark.parametrize("amenities", [[{"a": 1}], "wifi", [1, 2], None])
+def test_routes_reject_anything_but_a_list_of_strings(client, amenities):
+    assert client.put("/rooms/1/amenities", json={"amenities": amenities}).status_code == 400
+    batch = client.post("/batch", json={"operations": [
+        {"op": "setAmenities", "roomNo": "1", "amenities": amenities},
+    ]})
+    assert batch.status_code == 400
+    bulk = client.post("/rooms/bulk", data=json.dumps(
+        {"number": "2", "type": "SingleRoom", "price": 1, "amenities": amenities}
+    ))
+    assert bulk.status_code == 400
+    assert [r["number"] for r in client.get("/rooms").get_json()] == ["1"]
+    assert client.get("/rooms").get_json()[0]["amenities"] == []
+
+
+def test_route_stores_valid_amenities(client):
+    assert client.put("/rooms/1/amenities", json={"amenities": ["wifi", "tv"]}).status_code == 200
+    assert client.get("/rooms?amenity=tv").get_json()[0]["amenities"] == ["wifi", "tv"]
+
+
+def test_old_data_with_odd_amenities_still_loads(tmp_path):
+    rooms = [
+        {"number": "1", "type": "SingleRoom", "price": 100, "amenities": [{"a": 1}]},
+        {"number": "2", "type": "SingleRoom", "price": 100, "amenities": "wifi"},
+        {"number": "3", "type": "SingleRoom", "price": 100, "amenities": None},
+    ]
+    (tmp_path / "data.json").write_text(json.dumps({"rooms": rooms, "bookings": {}}))
+    client = create_app(tmp_path / "data.json").test_client()
+    listed = {r["number"]: r["amenities"] for r in client.get("/rooms").get_json()}
+    assert listed == {"1": [{"a": 1}], "2": ["wifi"], "3": []}
+
+
+def test_intern_table_is_bounded(monkeypatch):
+    monkeypatch.setattr(models, "_AMENITY_SETS", {})
+    monkeypatch.setattr(models, "AMENITY_SETS_MAX", 8)
+    room = SingleRoom("1", 100)
+    for i in range(50):
+        room.amenities = [f"amenity-{i}"]
+    assert len(models._AMENITY_SETS) == 8
+    assert room.amenities == ("amenity-49",)
+    shared = Hotel.room_from_dict({"number": "2", "price": 1, "amenities": ["amenity-0"]})
+    assert shared.amenities is models._AMENITY_SETS[("amenity-0",)]
@@ -0,0 +1,70 @@
+"""POST /batch and the transactions behind it."""
+from __future__ import annotations
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app
+from models import Booking, Hotel, SingleRoom
+
+
+def day(n: int) -> str:
+    return (date.today() + timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def hotel() -> Hotel:
+    hotel = Hotel()
+    hotel.add_room(SingleRoom("1", 100))
+    hotel.add_room(SingleRoom("2", 100))
+    hotel.drain_changes()
+    return hotel
+
+
+def test_failed_transaction_that_changed_nothing_touches_nothing(hotel):
+    version = hotel.version
+    with pytest.raises(ValueError):
+        with hotel.transaction(["1", "2"]):
+            raise ValueError("rejected")
+    assert hotel.version == version
+    assert hotel.drain_changes() == []
+
+
+def test_failed_transaction_restores_only_changed_rooms(hotel):
+    with pytest.raises(ValueError):
+        with hotel.transaction(["1", "2"]):
+            hotel.book_room("1", Booking("Ann", day(1), day(2), confirmation_number="A1"))
+            raise ValueError("rejected")
+    assert hotel.get_bookings("1") == []
+    assert hotel.drain_changes() == ["1"]
+    hotel.verify_stats()
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = create_app(tmp_path / "data.json").test_client()
+    assert client.post("/rooms", json={"number": "1", "type": "SingleRoom", "price": 100}).status_code == 201
+    return client
+
+
+def test_batch_and_single_routes_validate_alike(client):
+    single = client.post("/rooms/1/book", json={"guestName": "Ann", "checkIn": day(-3), "checkOut": day(-1)})
+    batch = client.post("/batch", json={"operations": [
+        {"op": "book", "roomNo": "1", "guestName": "Ann", "checkIn": day(-3), "checkOut": day(-1)},
+    ]})
+    assert single.status_code == batch.status_code == 400
+    assert single.get_json()["error"] == batch.get_json()["error"]
+
+    single = client.put("/rooms/1", json={"type": "Penthouse", "price": 50})
+    batch = client.post("/batch", json={"operations": [{"op": "updateRoom", "roomNo": "1", "type": "Penthouse", "price": 50}]})
+    assert single.status_code == batch.status_code == 400
+    assert single.get_json()["error"] == batch.get_json()["error"]
+    # the type is checked before anything changes
+    assert client.get("/rooms").get_json()[0]["price"] == 100
+
+
+def test_rejected_batch_keeps_etag(client):
+    etag = client.get("/rooms").headers["ETag"]
+    response = client.post("/batch", json={"operations": [{"op": "checkIn", "roomNo": "1"}]})
+    assert response.status_code == 400
+    assert client.get("/rooms", headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,106 @@
+"""All-or-nothing rollback of the JSON Lines bulk imports."""
+from __future__ import annotations
+import json
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app
+from models import Hotel
+
+
+def day(n: int) -> str:
+    return (date.today() + timedelta(days=n)).isoformat()
+
+
+def lines(*objects) -> bytes:
+    return b"".join(
+        (o if isinstance(o, bytes) else json.dumps(o).encode()) + b"\n" for o in objects
+    )
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = create_app(tmp_path / "data.json").test_client()
+    assert client.post("/rooms", json={"number": "1", "type": "SingleRoom", "price": 100}).status_code == 201
+    return client
+
+
+def bookings_of(client, room_no):
+    return client.get(f"/rooms/{room_no}/bookings").get_json()
+
+
+def test_failed_booking_import_keeps_existing_bookings(client):
+    original = client.post("/rooms/1/book", json={"guestName": "Ann", "checkIn": day(1), "checkOut": day(3)})
+    number = original.get_json()["confirmationNumber"]
+    body = lines(
+        {"roomNo": "1", "guestName": "Copy", "checkIn": day(5), "checkOut": day(7), "confirmationNumber": number},
+        {"roomNo": "1", "guestName": "New", "checkIn": day(8), "checkOut": day(9)},
+        b"not json",
+    )
+    response = client.post("/bookings/bulk", data=body)
+    assert response.status_code == 400
+    assert response.get_json()["line"] == 1
+    assert [(b["guestName"], b["confirmationNumber"]) for b in bookings_of(client, "1")] == [("Ann", number)]
+
+
+def test_booking_import_rolls_back_exactly_its_own_bookings(client):
+    client.post("/rooms/1/book", json={"guestName": "Ann", "checkIn": day(1), "checkOut": day(3)})
+    body = lines(
+        {"roomNo": "1", "guestName": "Bob", "checkIn": day(5), "checkOut": day(7), "confirmationNumber": "IMPORT1"},
+        {"roomNo": "1", "guestName": "Cat", "checkIn": day(8), "checkOut": day(9)},
+        {"roomNo": "1", "guestName": "Dan", "checkIn": day(2), "checkOut": day(4)},  # overlaps Ann
+    )
+    response = client.post("/bookings/bulk", data=body)
+    assert response.status_code == 400
+    assert response.get_json()["line"] == 3
+    assert [b["guestName"] for b in bookings_of(client, "1")] == ["Ann"]
+    assert client.get("/stats").get_json()["revenue"] == 200
+
+
+def test_failed_room_import_removes_its_rooms(client):
+    body = lines(
+        {"number": "2", "type": "SingleRoom", "price": 100},
+        {"number": "3", "type": "DoubleRoom", "price": 200},
+        {"number": "1", "type": "SingleRoom", "price": 100},  # already exists
+    )
+    response = client.post("/rooms/bulk", data=body)
+    assert response.status_code == 400
+    assert response.get_json()["line"] == 3
+    assert [r["number"] for r in client.get("/rooms").get_json()] == ["1"]
+
+
+def test_room_import_holds_its_rooms_until_it_commits(client, monkeypatch):
+    """A booking racing a failing import waits, then finds the room gone."""
+    added = threading.Event()
+    results = {}
+    add_room = Hotel.add_room
+
+    def add_and_race(hotel, room):
+        add_room(hotel, room)
+        if room.number == "3":
+            booker = threading.Thread(target=lambda: results.update(
+                status=client.post("/rooms/2/book", json={
+                    "guestName": "Eve", "checkIn": day(1), "checkOut": day(2),
+                }).status_code
+            ))
+            booker.start()
+            booker.join(0.2)
+            results["blocked"] = booker.is_alive()
+            results["booker"] = booker
+            added.set()
+
+    monkeypatch.setattr(Hotel, "add_room", add_and_race)
+    body = lines(
+        {"number": "2", "type": "SingleRoom", "price": 100},
+        {"number": "3", "type": "SingleRoom", "price": 100},
+        {"number": "1", "type": "SingleRoom", "price": 100},  # already exists
+    )
+    assert client.post("/rooms/bulk", data=body).status_code == 400
+    results["booker"].join()
+    assert added.is_set() and results["blocked"]
+    assert results["status"] == 400  # "Room not found" once the import rolled back
+    rooms = client.get("/rooms").get_json()
+    assert [r["number"] for r in rooms] == ["1"]
+    assert client.get("/guests/search?q=eve").get_json() == []
@@ -0,0 +1,26 @@
+"""ETags of the cached read routes."""
+from __future__ import annotations
+
+from app import create_app
+
+
+def test_etag_revalidates_until_a_change(tmp_path):
+    client = create_app(tmp_path / "data.json").test_client()
+    client.post("/rooms", json={"number": "1", "type": "SingleRoom", "price": 100})
+    etag = client.get("/rooms").headers["ETag"]
+    assert client.get("/rooms", headers={"If-None-Match": etag}).status_code == 304
+    client.put("/rooms/1", json={"price": 200})
+    assert client.get("/rooms", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_etag_from_before_a_restart_does_not_match(tmp_path):
+    client = create_app(tmp_path / "data.json").test_client()
+    client.post("/rooms", json={"number": "1", "type": "SingleRoom", "price": 100})
+    etag = client.get("/rooms").headers["ETag"]
+
+    # a new process over the same data starts counting versions again
+    restarted = create_app(tmp_path / "data.json").test_client()
+    restarted.put("/rooms/1", json={"price": 999})
+    response = restarted.get("/rooms", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()[0]["price"] == 999
@@ -0,0 +1,41 @@
+"""Resuming /events across a server restart."""
+from __future__ import annotations
+
+import pytest
+
+from events import EventBus
+
+
+def drain(sub):
+    events = []
+    while (event := sub.get(timeout=0)) is not None:
+        events.append(event)
+    return events
+
+
+def test_resume_replays_missed_events():
+    bus = EventBus()
+    seen = bus.publish("booked", {"roomNo": "1"})
+    bus.publish("unbooked", {"roomNo": "1"})
+    assert [e.type for e in drain(bus.subscribe(seen.id))] == ["unbooked"]
+
+
+def test_id_from_another_process_gets_resync():
+    old = EventBus()
+    for n in range(3):
+        old.publish("booked", {"roomNo": str(n)})
+    stale = old.publish("booked", {"roomNo": "9"}).id
+
+    # a restarted server reaches the same sequence number again
+    new = EventBus()
+    for n in range(6):
+        new.publish("booked", {"roomNo": str(n)})
+    assert stale.rsplit("-", 1)[1] == "4" and stale != f"{new.epoch}-4"
+    sub = new.subscribe(stale)
+    assert [e.type for e in drain(sub)] == ["resync"]
+    assert sub.overflowed
+
+
+def test_malformed_id_is_rejected():
+    with pytest.raises(ValueError):
+        EventBus().subscribe("abc-x")
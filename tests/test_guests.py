@@ -0,0 +1,42 @@
+"""Guest history is the same after a restart, whatever the storage backend."""
+from __future__ import annotations
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app
+
+
+def day(n: int) -> str:
+    return (date.today() + timedelta(days=n)).isoformat()
+
+
+def guests(client):
+    return {
+        g["name"]: (g["totalBookings"], len(g["bookings"]))
+        for g in client.get("/guests?limit=50").get_json()
+    }
+
+
+@pytest.mark.parametrize("storage,lazy", [("json", False), ("journal", False), ("sqlite", False), ("sqlite", True)])
+def test_guest_history_survives_restart(tmp_path, monkeypatch, storage, lazy):
+    if lazy:
+        monkeypatch.setenv("HOTEL_LAZY", "1")
+    path = tmp_path / "data.json"
+    client = create_app(path, storage).test_client()
+    for number in ("1", "2"):
+        assert client.post("/rooms", json={"number": number, "type": "SingleRoom", "price": 100}).status_code == 201
+    # Ann: one stay checked out, one still booked
+    assert client.post("/rooms/1/book", json={"guestName": "Ann", "guestEmail": "ann@example.com",
+                                              "checkIn": day(0), "checkOut": day(2)}).status_code == 200
+    assert client.post("/rooms/1/checkin").status_code == 200
+    assert client.post("/rooms/1/checkout").status_code == 200
+    assert client.post("/rooms/2/book", json={"guestName": "Ann", "guestEmail": "ann@example.com",
+                                              "checkIn": day(3), "checkOut": day(4)}).status_code == 200
+    # Bob: booked and unbooked, so nothing on the books or in the archive
+    assert client.post("/rooms/1/book", json={"guestName": "Bob", "checkIn": day(5), "checkOut": day(6)}).status_code == 200
+    assert client.post("/rooms/1/unbook").status_code == 200
+
+    before = guests(client)
+    assert before == {"Ann": (2, 1)}
+    assert guests(create_app(path, storage).test_client()) == before
@@ -0,0 +1,43 @@
+"""Room edits hold the room lock from lookup to response."""
+from __future__ import annotations
+import threading
+
+import pytest
+
+from app import create_app
+from models import Hotel
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = create_app(tmp_path / "data.json").test_client()
+    assert client.post("/rooms", json={"number": "1", "type": "SingleRoom", "price": 100}).status_code == 201
+    return client
+
+
+@pytest.mark.parametrize("method,path,body", [
+    ("set_room_status", "/rooms/1/status", {"status": "maintenance"}),
+    ("set_room_amenities", "/rooms/1/amenities", {"amenities": ["wifi"]}),
+    ("set_room_price", "/rooms/1", {"price": 150}),
+])
+def test_delete_waits_for_an_edit_in_progress(client, monkeypatch, method, path, body):
+    results = {}
+    original = getattr(Hotel, method)
+
+    def change_and_race(hotel, *args):
+        deleter = threading.Thread(target=lambda: results.update(
+            status=client.delete("/rooms/1").status_code
+        ))
+        deleter.start()
+        deleter.join(0.2)
+        results["blocked"] = deleter.is_alive()
+        results["deleter"] = deleter
+        original(hotel, *args)
+
+    monkeypatch.setattr(Hotel, method, change_and_race)
+    response = client.put(path, json=body)
+    results["deleter"].join()
+    assert results["blocked"]
+    assert response.status_code == 200 and response.get_json()["number"] == "1"
+    assert results["status"] == 200
+    assert client.put(path, json=body).status_code == 404
@@ -0,0 +1,123 @@
+"""The running statistics must match a full recompute after every change."""
+from __future__ import annotations
+from datetime import date, timedelta
+
+import pytest
+
+from app import create_app
+from models import Booking, DoubleRoom, Hotel, SingleRoom, SuiteRoom
+
+
+def day(n: int) -> str:
+    return (date.today() + timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def hotel() -> Hotel:
+    hotel = Hotel()
+    hotel.add_room(SingleRoom("101", 1000))
+    hotel.add_room(DoubleRoom("102", 1500))
+    hotel.add_room(SuiteRoom("201", 4000))
+    hotel.verify_stats()
+    return hotel
+
+
+def stay(guest: str, start: int, end: int, confirmation: str) -> Booking:
+    return Booking(guest, day(start), day(end), confirmation_number=confirmation)
+
+
+def test_book_and_unbook(hotel):
+    hotel.book_room("101", stay("Ann", 1, 3, "A1"))
+    hotel.verify_stats()
+    hotel.book_room("101", stay("Bob", 5, 9, "B1"))  # a later reservation
+    hotel.verify_stats()
+    hotel.unbook_room("101")  # Bob's stay becomes current
+    hotel.verify_stats()
+    assert hotel.get_room("101").booked_by == "Bob"
+    hotel.unbook_room("101")
+    hotel.verify_stats()
+    assert hotel.get_stats()["bookedRooms"] == 0
+
+
+def test_cancel_and_modify_dates(hotel):
+    hotel.book_room("102", stay("Ann", 1, 3, "A1"))
+    hotel.book_room("102", stay("Bob", 5, 7, "B1"))
+    hotel.update_booking("102", "A1", check_out=day(4))  # longer current stay
+    hotel.verify_stats()
+    hotel.update_booking("102", "B1", check_in=day(0), check_out=day(1))  # jumps ahead
+    hotel.verify_stats()
+    assert hotel.get_room("102").booked_by == "Bob"
+    hotel.cancel_booking("102", "B1")
+    hotel.verify_stats()
+    assert hotel.get_stats()["revenue"] == 1500 * 3
+
+
+def test_price_status_and_amenities(hotel):
+    hotel.book_room("201", stay("Ann", 1, 3, "A1"))
+    hotel.set_room_price("201", 5000)
+    hotel.verify_stats()
+    assert hotel.get_stats()["revenue"] == 5000 * 2
+    hotel.set_room_status("101", "maintenance")
+    hotel.verify_stats()
+    hotel.set_room_status("101", "available")
+    hotel.set_room_amenities("102", ["wifi", "tv"])
+    hotel.verify_stats()
+
+
+def test_type_swap_and_delete(hotel):
+    hotel.replace_room(hotel.get_room("101"), SuiteRoom("101", 3000))
+    hotel.verify_stats()
+    hotel.book_room("101", stay("Ann", 1, 2, "A1"))
+    hotel.verify_stats()
+    hotel.remove_room(hotel.get_room("102"))
+    hotel.verify_stats()
+    assert hotel.get_stats()["totalRooms"] == 2
+
+
+def test_rejected_changes_leave_stats_alone(hotel):
+    hotel.book_room("101", stay("Ann", 1, 3, "A1"))
+    with pytest.raises(ValueError):
+        hotel.book_room("101", stay("Bob", 2, 4, "B1"))  # overlaps
+    with pytest.raises(LookupError):
+        hotel.set_room_price("999", 10)
+    hotel.verify_stats()
+
+
+def test_transaction_rollback(hotel):
+    hotel.book_room("101", stay("Ann", 1, 3, "A1"))
+    with pytest.raises(ValueError):
+        with hotel.transaction(["101", "102"]):
+            hotel.unbook_room("101")
+            hotel.set_room_price("102", 99)
+            raise ValueError("abort")
+    hotel.verify_stats()
+    assert hotel.get_room("101").booked_by == "Ann"
+    assert hotel.get_room("102").price == 1500
+
+
+def test_api_routes(tmp_path, monkeypatch):
+    """The same check through the HTTP routes, with /stats verifying itself."""
+    monkeypatch.setenv("HOTEL_CHECK_STATS", "1")
+    client = create_app(tmp_path / "data.json").test_client()
+
+    def stats_ok():
+        response = client.get("/stats")
+        assert response.status_code == 200
+        return response.get_json()
+
+    for number, rtype, price in (("1", "SingleRoom", 100), ("2", "DoubleRoom", 200)):
+        assert client.post("/rooms", json={"number": number, "type": rtype, "price": price}).status_code == 201
+    stats_ok()
+    booked = client.post("/rooms/1/book", json={"guestName": "Ann", "checkIn": day(0), "checkOut": day(2)})
+    confirmation = booked.get_json()["confirmationNumber"]
+    assert stats_ok()["revenue"] == 200
+    client.put("/rooms/1/booking", json={"confirmationNumber": confirmation, "checkOut": day(3)})
+    assert stats_ok()["revenue"] == 300
+    client.put("/rooms/2", json={"price": 250, "type": "SuiteRoom"})
+    client.put("/rooms/2/status", json={"status": "cleaning"})
+    assert stats_ok()["availableRooms"] == 0
+    client.post("/rooms/1/checkin")
+    client.post("/rooms/1/checkout")
+    assert stats_ok()["bookedRooms"] == 0
+    client.delete("/rooms/2")
+    assert stats_ok()["totalRooms"] == 1